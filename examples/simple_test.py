@@ -1,28 +1,182 @@
 import asyncio
+import functools
+import logging
 import os
+import queue
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Optional
 
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Project root first on sys.path so the `src` package resolves on the first entry
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.core.ai_agent import MultiPhaseTestingAgent, AgentConfig, AIProvider, TestPhase
+from src.core.ai_agent import MultiPhaseTestingAgent, AgentConfig, AIProvider, TestPhase, STATUS_ICONS
+from src.core.ai_agent import progress as agent_progress
+from src.core.phase_cache import PhaseCache
+from src.core.semantic_cache import SemanticCache
 from dotenv import load_dotenv
+from openai import APIError, APITimeoutError
+import httpx
+import tiktoken
 
 load_dotenv()
 
-async def run_basic_multiphasetesting_example():
+log = logging.getLogger(__name__)
+
+# Failures the examples expect and report; anything else propagates to main()
+EXPECTED_ERRORS = (APIError, APITimeoutError, httpx.HTTPError, KeyError, asyncio.TimeoutError)
+
+# Loaded once; building the encoding is the expensive part
+TOKEN_ENCODING = tiktoken.encoding_for_model("gpt-4o")
+ANALYSIS_CONTEXT_TOKENS = 256
+
+
+def truncate_tokens(text: str, max_tokens: int = ANALYSIS_CONTEXT_TOKENS) -> str:
+    """Truncate text to a token budget, always cutting on a token boundary."""
+    tokens = TOKEN_ENCODING.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return TOKEN_ENCODING.decode(tokens[:max_tokens])
+
+# Static testing requirements, sent at the very head of every phase prompt.
+# Keep this block free of run-specific values (URLs, timestamps) and above
+# ~1024 tokens so Azure OpenAI's automatic prefix cache matches across all
+# four phases of a cycle; variable content goes in `dynamic_suffix`.
+STATIC_REQUIREMENTS_PREFIX = """
+# Multi-Phase Testing Framework - Standing Requirements
+
+You are part of a four-phase autonomous web testing pipeline: Analysis, Planning,
+Execution and Reporting. Each phase is handled by a dedicated agent, and every agent
+receives these standing requirements first. Phase-specific instructions, the target
+application and the run timestamp always follow after this block.
+
+## General Testing Standards
+- Treat the application under test as a black box; only interact with it through the
+  browser, exactly as a real user would.
+- Never submit real payment details, real personal data or production credentials.
+  Use clearly synthetic test data (e.g. "Test User", "test@example.com").
+- Prefer deterministic, reproducible steps. Every finding must include the exact steps,
+  inputs and observed output needed to reproduce it.
+- Distinguish clearly between verified facts (observed in the browser or in saved
+  files) and assumptions. Label assumptions explicitly.
+- When an action fails, capture evidence first, then retry at most once before
+  recording the failure and moving on to the next item.
+- Do not stop the whole phase because of a single failing step; record it and continue.
+
+## Evidence Conventions
+- Take a screenshot before and after every significant interaction, and on every
+  error or unexpected state.
+- Screenshot and file names must be descriptive, lowercase, use underscores instead
+  of spaces, and include the test or step identifier where one exists.
+- Save structured data (inventories, scenarios, results, metrics) as JSON and
+  human-readable findings as markdown.
+- Every report must reference the evidence files that support its findings.
+
+## Severity Classification
+- **Critical**: core workflow is blocked, data loss or corruption, security exposure.
+- **High**: major feature misbehaves with no reasonable workaround.
+- **Medium**: feature misbehaves but a workaround exists, or validation is missing.
+- **Low**: cosmetic issues, minor inconsistencies, copy or layout defects.
+- **Info**: observations and improvement suggestions that are not defects.
+
+## Priority Guidance
+- Test critical user journeys first, then data validation, then edge cases, then
+  cosmetic and accessibility checks.
+- Within a category, prefer tests that cover state changes over read-only checks.
+
+## Accessibility Baseline
+- Check that interactive elements are reachable and operable by keyboard alone.
+- Check for visible focus indicators, meaningful labels on inputs and buttons, and
+  sufficient text contrast.
+- Note missing ARIA roles or landmarks where they would help assistive technology.
+
+## Test Data Guidelines
+- Use short, medium and very long strings (at least 500 characters) for text inputs.
+- Include unicode, emoji, HTML-like markup (e.g. "<b>bold</b>") and quote characters
+  to probe escaping and rendering.
+- Include leading and trailing whitespace and whitespace-only input.
+- Reuse the same data set across phases so results remain comparable between runs.
+
+## Browser and Session Handling
+- Start every phase from a fresh page load of the target application.
+- Do not rely on state left behind by a previous phase unless the plan says so;
+  if local storage or cookies influence behaviour, record their state in the results.
+- Wait for the page to settle after each navigation or interaction before asserting.
+- Close dialogs and reset filters at the end of each test case.
+
+## Reporting Conventions
+- Use markdown headings for structure and tables for test results and metrics.
+- Every test case has an identifier (TC001, TC002, ...), a title, steps, expected
+  result, actual result, status (PASSED, FAILED, BLOCKED, SKIPPED) and evidence.
+- Every issue has an identifier (ISSUE-001, ...), severity, affected feature,
+  reproduction steps, expected versus actual behaviour and evidence references.
+- Summaries state totals first: test cases planned, executed, passed, failed, blocked.
+
+## Definition of Done
+- Analysis: every focus area below is mapped to concrete pages, elements and workflows.
+- Planning: every focus area has prioritised test cases with steps and test data.
+- Execution: every planned test case has a recorded status and supporting evidence.
+- Reporting: totals, per-area coverage, issues by severity and recommendations are
+  consolidated into a single final report with an evidence catalog.
+
+## Application Focus Areas
+Focus on the following key areas:
+1. **Todo Management**: Creating, editing, and deleting todos
+2. **Filtering**: All, Active, Completed filter functionality
+3. **Bulk Operations**: Mark all complete, clear completed
+4. **Data Persistence**: Todo state management
+5. **User Interface**: Responsive design and accessibility
+6. **Edge Cases**: Empty states, long text, special characters
+
+For every focus area, cover the happy path, at least one negative case and at least
+one boundary case. Record which focus area each test case and issue belongs to so the
+final report can present coverage and findings per area.
+"""
+
+PHASE_DISPLAY_NAMES = {
+    "analysis": "Analysis",
+    "planning": "Planning",
+    "execution": "Execution",
+    "reporting": "Reporting",
+}
+
+# Local store for semantically cached testing cycles
+CACHE_DB_PATH = PROJECT_ROOT / ".cache" / "semantic_cache.sqlite3"
+# Set BYPASS_CYCLE_CACHE=1 to always run a fresh cycle; cached cycles expire after
+# CYCLE_CACHE_MAX_AGE_HOURS (default 24)
+BYPASS_CYCLE_CACHE = os.getenv("BYPASS_CYCLE_CACHE", "").lower() in ("1", "true", "yes")
+CYCLE_CACHE_MAX_AGE = timedelta(hours=float(os.getenv("CYCLE_CACHE_MAX_AGE_HOURS", "24")))
+# Content-hash keyed per-phase results; unchanged phases replay from disk
+PHASE_CACHE_DIR = PROJECT_ROOT / ".cache" / "phases"
+# Semantically matched Planning/Reporting outputs, keyed by phase template and target
+PROMPT_CACHE_DB_PATH = PROJECT_ROOT / ".cache" / "prompt_cache.sqlite3"
+
+async def run_basic_multiphasetesting_example(agent: Optional[MultiPhaseTestingAgent] = None):
     """
     Simple example showing how to use the Multi-Phase Testing framework.
     """
-    print("🚀 Starting Multi-Phase AI testing example...")
-    print(f"⏰ Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    config = set_config()
+    agent = agent or _get_agent()
+    if agent is None:
+        log.info("❌ Aborting: invalid configuration")
+        return None
+    now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    log.info("🚀 Starting Multi-Phase AI testing example...")
+    log.info(f"⏰ Timestamp: {now_str}")
 
-    # Create Multi-Phase Testing Agent
-    agent = MultiPhaseTestingAgent(config)
-    print("✅ Multi-Phase Testing Agent initialized")
+    # Semantically equivalent re-runs against the same URL reuse recent stored results
+    cache = None
+    if not BYPASS_CYCLE_CACHE:
+        cache = SemanticCache(
+            agent.client,
+            CACHE_DB_PATH,
+            embedding_model=agent.config.embedding_deployment,
+            verification_model=agent.config.deployment_name,
+            max_age=CYCLE_CACHE_MAX_AGE,
+        )
     
     # Target application for testing
     target_url = "https://demo.playwright.dev/todomvc/"
@@ -30,143 +184,273 @@ async def run_basic_multiphasetesting_example():
     # target_url = "https://www.saucedemo.com/"
     # target_url = "https://demowebshop.tricentis.com/"
     
-    # Define specific testing requirements
-    requirements = """
-    Focus on the following key areas:
-    1. **Todo Management**: Creating, editing, and deleting todos
-    2. **Filtering**: All, Active, Completed filter functionality
-    3. **Bulk Operations**: Mark all complete, clear completed
-    4. **Data Persistence**: Todo state management
-    5. **User Interface**: Responsive design and accessibility
-    6. **Edge Cases**: Empty states, long text, special characters
-    """
-    
     try:
-        print(f"🎯 Starting complete testing cycle for: {target_url}")
-        print("📋 This will execute 4 phases: Analysis → Planning → Execution → Reporting")
+        log.info(f"🎯 Starting complete testing cycle for: {target_url}")
+        log.info("📋 This will execute 4 phases: Analysis → Planning → Execution → Reporting")
         
-        # Execute complete testing cycle
-        results = await agent.run_complete_testing_cycle(
-            target_url=target_url,
-            requirements=requirements
-        )
+        ran_cycle = False
+        
+        async def stream_cycle():
+            nonlocal ran_cycle
+            ran_cycle = True
+            # Report each phase the moment it finishes instead of after the whole cycle
+            phase_results = {}
+            async for phase_result in agent.stream_testing_cycle(
+                target_url=target_url,
+                requirements=STATIC_REQUIREMENTS_PREFIX,
+                dynamic_suffix=f"Target: {target_url}",
+                fan_out_analysis=True
+            ):
+                phase_results[phase_result["phase"]] = phase_result
+                status_icon = STATUS_ICONS.get(phase_result["status"], "❌")
+                phase_name = PHASE_DISPLAY_NAMES.get(phase_result["phase"], phase_result["phase"].title())
+                log.info(f"{status_icon} {phase_name}: {phase_result.get('filepath', 'N/A')}")
+            return await agent.finalize_testing_cycle(target_url, phase_results)
         
-        # Display results summary
-        print("\n" + "="*60)
-        print("📊 TESTING CYCLE RESULTS")
-        print("="*60)
-        print(f"🎯 Target URL: {results['target_url']}")
-        print(f"⏰ Timestamp: {results['timestamp']}")
-        print(f"📈 Overall Status: {results['overall_status'].upper()}")
-        print(f"📄 Summary Report: {results.get('summary_file', 'N/A')}")
+        # Execute complete testing cycle (or reuse a cached equivalent run)
+        if cache is None:
+            results = await stream_cycle()
+        else:
+            try:
+                results = await cache.get_or_compute(
+                    scope=f"{target_url}::complete_cycle",
+                    text=STATIC_REQUIREMENTS_PREFIX,
+                    compute=stream_cycle,
+                    cacheable=lambda r: r["overall_status"] == "completed",
+                )
+            finally:
+                cache.close()
+        from_cache = not ran_cycle
+        
+        # Display results summary, emitted with a single write
+        overall = results['overall_status']
+        phase_lines = "\n".join(
+            f"   {STATUS_ICONS.get(phase_result.get('status'), '❌')} "
+            f"{PHASE_DISPLAY_NAMES.get(phase_name, phase_name.title())} Phase: {phase_result.get('filepath', 'N/A')}"
+            for phase_name, phase_result in results["phases"].items()
+        )
         
-        print(f"\n📁 Generated Reports:")
-        for phase_name, phase_result in results["phases"].items():
-            status_icon = "✅" if phase_result.get("status") == "completed" else "❌"
-            print(f"   {status_icon} {phase_name.title()} Phase: {phase_result.get('filepath', 'N/A')}")
+        buf = [
+            "\n" + "="*60,
+            "📊 TESTING CYCLE RESULTS",
+            "="*60,
+            f"🎯 Target URL: {results['target_url']}",
+            f"⏰ Timestamp: {results['timestamp']}",
+            f"📈 Overall Status: {overall.upper()}",
+            f"📄 Summary Report: {results.get('summary_file', 'N/A')}",
+            "\n📁 Generated Reports:",
+            phase_lines,
+        ]
+        if from_cache:
+            buf += [
+                f"\n♻️ Served from cache: these are the results of the run at {results['timestamp']}.",
+                "   Set BYPASS_CYCLE_CACHE=1 to run a fresh cycle.",
+            ]
         
         # Provide next steps
-        if results['overall_status'] == 'completed':
-            print(f"\n🎉 SUCCESS: Complete testing cycle finished!")
-            print(f"📖 Next steps:")
-            print(f"   1. Review individual phase reports for detailed findings")
-            print(f"   2. Check execution phase for any issues found")
-            print(f"   3. Implement recommendations from reporting phase")
+        if overall == 'completed':
+            buf += [
+                "\n🎉 SUCCESS: Complete testing cycle finished!" + (" (cached run)" if from_cache else ""),
+                "📖 Next steps:",
+                "   1. Review individual phase reports for detailed findings",
+                "   2. Check execution phase for any issues found",
+                "   3. Implement recommendations from reporting phase",
+            ]
         else:
-            print(f"\n⚠️ PARTIAL: Testing cycle completed with some issues")
-            print(f"📖 Recommended actions:")
-            print(f"   1. Check individual phase reports for errors")
-            print(f"   2. Verify MCP server connectivity")
-            print(f"   3. Review Azure OpenAI configuration")
+            buf += [
+                "\n⚠️ PARTIAL: Testing cycle completed with some issues",
+                "📖 Recommended actions:",
+                "   1. Check individual phase reports for errors",
+                "   2. Verify MCP server connectivity",
+                "   3. Review Azure OpenAI configuration",
+            ]
+        log.info("\n".join(buf))
         
         return results
         
-    except Exception as e:
-        print(f"❌ Error during testing cycle: {str(e)}")
-        print(f"🔧 Troubleshooting suggestions:")
-        print(f"   1. Verify Azure OpenAI credentials")
-        print(f"   2. Check internet connectivity")
-        print(f"   3. Ensure Node.js and npx are installed")
-        print(f"   4. Verify target URL is accessible")
+    except EXPECTED_ERRORS as e:
+        log.error("❌ Error during testing cycle: %r", e)
+        log.info("🔧 Troubleshooting suggestions:")
+        log.info("   1. Verify Azure OpenAI credentials")
+        log.info("   2. Check internet connectivity")
+        log.info("   3. Ensure Node.js and npx are installed")
+        log.info("   4. Verify target URL is accessible")
         return None
 
+@functools.lru_cache(maxsize=1)
 def set_config():
-    try:
-        config = AgentConfig(
-                provider=AIProvider.AZURE_OPENAI, 
-                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-                endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                deployment_name=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT"),
-                api_version=os.getenv("AZURE_OPENAI_API_VERSION")
-            )
-                
-        print("✅ Configuration loaded from file")
-        return config
-        
-    except ValueError:
-        # Validate configuration
-        if not all([config.api_key, config.endpoint, config.deployment_name]):
-            print("❌ Missing required Azure OpenAI environment variables:")
-            print("   - AZURE_OPENAI_API_KEY")
-            print("   - AZURE_OPENAI_ENDPOINT") 
-            print("   - AZURE_OPENAI_CHAT_DEPLOYMENT_MODEL")
-
-    return None    
+    # Validate configuration before building anything, so misconfigured runs fail fast
+    env = {
+        name: os.getenv(name)
+        for name in (
+            "AZURE_OPENAI_API_KEY",
+            "AZURE_OPENAI_ENDPOINT",
+            "AZURE_OPENAI_CHAT_DEPLOYMENT",
+            "AZURE_OPENAI_API_VERSION",
+        )
+    }
+    missing = [name for name, value in env.items() if not value]
+    if missing:
+        log.info("❌ Missing required Azure OpenAI environment variables:")
+        for name in missing:
+            log.info(f"   - {name}")
+        return None
+
+    # Analysis mostly summarizes page structure, so it can run on a smaller, faster deployment
+    deployment_name = env["AZURE_OPENAI_CHAT_DEPLOYMENT"]
+    fast_deployment = os.getenv("AZURE_OPENAI_FAST_DEPLOYMENT") or deployment_name
+
+    config = AgentConfig(
+            provider=AIProvider.AZURE_OPENAI, 
+            api_key=env["AZURE_OPENAI_API_KEY"],
+            endpoint=env["AZURE_OPENAI_ENDPOINT"],
+            deployment_name=deployment_name,
+            api_version=env["AZURE_OPENAI_API_VERSION"],
+            embedding_deployment=os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-3-small"),
+            phase_deployments={
+                TestPhase.ANALYSIS: fast_deployment,
+                TestPhase.PLANNING: deployment_name,
+                TestPhase.EXECUTION: deployment_name,
+                TestPhase.REPORTING: deployment_name,
+            }
+        )
+            
+    log.info("✅ Configuration loaded from file")
+    return config
+
+
+@functools.lru_cache(maxsize=1)
+def _get_agent():
+    """Build the agent once per process; its HTTP client binds to the running loop lazily."""
+    config = set_config()
+    if config is None:
+        return None
+    return MultiPhaseTestingAgent(
+        config,
+        phase_cache=PhaseCache(PHASE_CACHE_DIR),
+        prompt_cache_path=PROMPT_CACHE_DB_PATH,
+    )
     
 
-async def run_individual_phase_example():
+async def run_individual_phase_example(agent: Optional[MultiPhaseTestingAgent] = None):
     """
     Example showing how to run individual testing phases.
     """
-    print("\n🔍 Running Individual Phase Example...")
-    
-    # Load configuration
-    config = set_config()
+    agent = agent or _get_agent()
+    if agent is None:
+        log.info("❌ Aborting: invalid configuration")
+        return False
+    log.info("\n🔍 Running Individual Phase Example...")
     
-    agent = MultiPhaseTestingAgent(config)
     target_url = "https://demo.playwright.dev/todomvc/"
+    # Runs alongside the complete cycle on the same agent; the label keeps this
+    # example's reports and phase directories apart from the cycle's
+    label = "individual"
     
     try:
-        # Example: Run only Analysis phase
-        print("📊 Running Analysis Phase only...")
-        analysis_result = await agent._execute_phase(
+        # Example: Run Analysis phase, streaming its output
+        log.info("📊 Running Analysis Phase...")
+        analysis_prefix = asyncio.get_running_loop().create_future()
+        analysis_task = asyncio.create_task(agent._execute_phase(
             TestPhase.ANALYSIS, 
             target_url, 
-            "Focus on todo application structure and core functionality"
-        )
-        
-        print(f"✅ Analysis completed: {analysis_result.get('filepath', 'N/A')}")
+            "Focus on todo application structure and core functionality",
+            output_prefix=analysis_prefix,
+            # Enough characters to fill the token budget below
+            prefix_chars=ANALYSIS_CONTEXT_TOKENS * 6,
+            label=label
+        ))
         
-        # Example: Run Planning phase with analysis context
-        if analysis_result.get('status') == 'completed':
-            print("📋 Running Planning Phase with analysis context...")
-            planning_result = await agent._execute_phase(
+        # Example: Start Planning speculatively once enough analysis output has
+        # streamed in, overlapping the rest of the analysis run
+        await asyncio.wait({analysis_task, analysis_prefix}, return_when=asyncio.FIRST_COMPLETED)
+        planning_task = None
+        if analysis_prefix.done() and not analysis_prefix.cancelled():
+            log.info("📋 Running Planning Phase with streamed analysis context...")
+            planning_task = asyncio.create_task(agent._execute_phase(
                 TestPhase.PLANNING,
                 target_url,
-                f"Analysis results: {analysis_result['result'][:500]}..."
-            )
-            
-            print(f"✅ Planning completed: {planning_result.get('filepath', 'N/A')}")
+                f"Analysis results: {truncate_tokens(analysis_prefix.result())}...",
+                label=label
+            ))
+        else:
+            analysis_prefix.cancel()
+        
+        if planning_task is None:
+            analysis_result = await analysis_task
+            log.info(f"✅ Analysis completed: {analysis_result.get('filepath', 'N/A')}")
+        else:
+            analysis_result, planning_result = await asyncio.gather(analysis_task, planning_task)
+            log.info(f"✅ Analysis completed: {analysis_result.get('filepath', 'N/A')}")
+            log.info(f"✅ Planning completed: {planning_result.get('filepath', 'N/A')}")
         
         return True
         
-    except Exception as e:
-        print(f"❌ Individual phase example failed: {str(e)}")
+    except EXPECTED_ERRORS as e:
+        log.error("❌ Individual phase example failed: %r", e)
         return False
 
+def start_progress_output() -> QueueListener:
+    """
+    Print the agent's progress lines and this example's output from one
+    background thread, in the order they were emitted, without blocking the
+    event loop on stdout. Stop the returned listener to flush it.
+    """
+    records = queue.SimpleQueue()
+    for output in (agent_progress, log):
+        output.addHandler(QueueHandler(records))
+        output.setLevel(logging.INFO)
+        output.propagate = False
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(records, handler)
+    listener.start()
+    return listener
+
 async def main():
     """
     Main function demonstrating different usage patterns.
     """
-    print("🤖 Multi-Phase AI Testing Framework Examples")
-    print("=" * 50)
+    listener = start_progress_output()
+    try:
+        log.info("🤖 Multi-Phase AI Testing Framework Examples")
+        log.info("=" * 50)
     
-    # Example 1: Complete testing cycle (recommended)
-    print("\n1️⃣ COMPLETE TESTING CYCLE EXAMPLE")
-    results = await run_basic_multiphasetesting_example()
+        # One agent (and one HTTP client) shared by both examples
+        agent = _get_agent()
+        if agent is None:
+            log.info("❌ Aborting: invalid configuration")
+            return
+        log.info("✅ Multi-Phase Testing Agent initialized")
     
-    if results and results['overall_status'] == 'completed':
-        print("✅ Complete cycle example finished successfully!")
+        # Example 1: Complete testing cycle (recommended)
+        # Example 2: Individual phases, run concurrently with example 1
+        log.info("\n1️⃣ COMPLETE TESTING CYCLE EXAMPLE + 2️⃣ INDIVIDUAL PHASE EXAMPLE")
+        try:
+            results, individual_result = await asyncio.gather(
+                run_basic_multiphasetesting_example(agent),
+                run_individual_phase_example(agent),
+                return_exceptions=True
+            )
+        finally:
+            # Stop the MCP servers the agent kept warm across phases
+            await agent.aclose()
+    
+        # Unexpected failures were not handled inside the examples; log each once here
+        for outcome in (results, individual_result):
+            if isinstance(outcome, BaseException):
+                log.error("Example failed unexpectedly", exc_info=outcome)
+    
+        if isinstance(results, dict) and results['overall_status'] == 'completed':
+            log.info("✅ Complete cycle example finished successfully!")
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # libuv-backed event loop where available; Windows keeps the default loop
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
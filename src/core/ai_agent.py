@@ -1,18 +1,28 @@
 import asyncio
+import functools
+import logging
 import os
+import re
 from pathlib import Path
 import shutil
+import time
+import string
+import textwrap
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Any
+from dataclasses import dataclass, field
 from enum import Enum
+from html import escape as html_escape
+import aiofiles
+import httpx
 import structlog
 from openai import AsyncAzureOpenAI
+from openai.types.responses import ResponseTextDeltaEvent
 
 # Import MCP Studio components
-from agents.mcp import MCPServerStdio
 from agents import (
     Agent,
+    ModelSettings,
     RunContextWrapper,
     Runner,
     set_default_openai_client,
@@ -20,8 +30,98 @@ from agents import (
     set_tracing_disabled,
 )
 
+from . import json_io
+from .file_tools import build_file_tools, build_jsonl_tools
+from .mcp_pool import MCPServerPool
+from .phase_cache import PhaseCache
+from .semantic_cache import SemanticCache
+
 logger = structlog.get_logger()
 
+# Console progress lines ("✅ Analysis Phase completed", ...) go through standard
+# logging at INFO, so the host application decides where and how they are written
+progress = logging.getLogger(__name__)
+
+# Characters not allowed in generated file and directory names; each run becomes "_"
+_SANITIZE_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+def _sanitize(text: str) -> str:
+    return _SANITIZE_RE.sub("_", text)
+
+# Console/summary icon per phase status; a "partial" phase kept some output (e.g. a
+# fan-out Analysis with failed focus areas). Other statuses are shown as "❌".
+STATUS_ICONS = {"completed": "✅", "partial": "⚠️"}
+
+# Numbered focus-area lines ("1. **Todo Management**: ...") in a requirements block
+_FOCUS_AREA_RE = re.compile(r"^\s*\d+\.\s+(.+?)\s*$", re.MULTILINE)
+
+# Updates the installed progress bar in place; called with a small JSON params object
+_PROGRESS_UPDATE_JS = """((P) => {
+    const timeElement = document.getElementById('progress-time');
+    if (timeElement) timeElement.textContent = P.time;
+    const textElement = document.getElementById('progress-text');
+    if (textElement) textElement.textContent = P.step;
+    const phaseElement = document.getElementById('progress-phase');
+    if (phaseElement) phaseElement.textContent = P.phase;
+})"""
+
+@functools.lru_cache(maxsize=64)
+def _path_exists_in_bucket(path: str, bucket: int) -> bool:
+    return os.path.exists(path)
+
+def _path_exists_cached(path: str, ttl: float = 1.0) -> bool:
+    """os.path.exists memoized for about `ttl` seconds; for status output only."""
+    return _path_exists_in_bucket(path, int(time.monotonic() // ttl))
+
+def _summarize_for_context(text: str, head: int = 512, tail: int = 512) -> str:
+    """Keep the start and the end of a long phase output; short outputs are returned as-is."""
+    if len(text) <= head + tail:
+        return text
+    return f"{text[:head]}\n...[truncated]...\n{text[-tail:]}"
+
+def _count_files(path: Path, suffix: str = "", recursive: bool = False) -> int:
+    """Count regular files (optionally by suffix) with os.scandir, without building Path objects."""
+    count = 0
+    pending = [os.fspath(path)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                    elif entry.name.endswith(suffix) and entry.is_file():
+                        count += 1
+        except FileNotFoundError:
+            continue
+    return count
+
+# One HTTP/2 connection pool shared by every open agent in the process, so concurrent
+# phases multiplex over the same TLS connection instead of opening their own. It is
+# closed when the last agent closes; its connections belong to the event loop that
+# used them, so the next agent (e.g. in a later asyncio.run) gets a fresh client.
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_users = 0
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared client; every call must be paired with `_release_http_client`."""
+    global _http_client, _http_client_users
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+    _http_client_users += 1
+    return _http_client
+
+async def _release_http_client():
+    global _http_client, _http_client_users
+    _http_client_users = max(_http_client_users - 1, 0)
+    if _http_client_users == 0 and _http_client is not None:
+        client, _http_client = _http_client, None
+        await client.aclose()
+
 class AIProvider(Enum):
     AZURE_OPENAI = "AZURE_OPENAI"
     OPENAI = "openai"
@@ -32,6 +132,14 @@ class TestPhase(Enum):
     PLANNING = "planning"
     EXECUTION = "execution"
     REPORTING = "reporting"
+    
+    # Display forms of the value, set once per member below
+    upper_name: str
+    title_name: str
+
+for _phase in TestPhase:
+    _phase.upper_name = _phase.value.upper()
+    _phase.title_name = _phase.value.title()
 
 @dataclass
 class AgentConfig:
@@ -42,118 +150,37 @@ class AgentConfig:
     api_version: str
     max_tokens: int = 4000
     temperature: float = 0.1
+    # Per-phase deployment overrides; phases not listed use deployment_name
+    phase_deployments: Dict[TestPhase, str] = field(default_factory=dict)
+    embedding_deployment: str = "text-embedding-3-small"
 
-class MultiPhaseTestingAgent:
-    """
-    Multi-agent system for comprehensive web application testing.
-    Each phase has its own specialized agent with dedicated responsibilities.
-    """
-    
-    def __init__(self, config: AgentConfig):
-        self.config = config
-        self.logger = logger.bind(component="multi_phase_testing_agent")
-        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-                # Set up proper directory structure
-        self.project_root = Path(__file__).parent.parent.parent  # Go up to project root
-        self.reports_dir = self.project_root / "reports/test_reports"
-        self.fs_files_dir = self.project_root / "reports/fs_files"
-        self.screenshots_dir = self.project_root / "reports/screenshots"
-        
-        # Create directories
-        self.reports_dir.mkdir(exist_ok=True)
-        self.fs_files_dir.mkdir(exist_ok=True)
-        self.screenshots_dir.mkdir(exist_ok=True)
-        
-        # Set up Azure OpenAI client
-        self.client = AsyncAzureOpenAI(
-            api_key=config.api_key,
-            azure_endpoint=config.endpoint,
-            api_version=config.api_version,
-        )
-        
-        set_default_openai_client(self.client)
-        set_tracing_disabled(disabled=True)
-
-        # Initialize specialized agents
-        self.agents = {}
-        self._create_specialized_agents()
-        
-                # Progress indicator HTML
-        self.progress_html = """
-        <div id="testing-progress-bar" style="
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 60px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            z-index: 999999;
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            padding: 0 20px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.3);
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 14px;
-        ">
-            <div style="display: flex; align-items: center;">
-                <div id="progress-spinner" style="
-                    width: 20px;
-                    height: 20px;
-                    border: 2px solid #ffffff40;
-                    border-top: 2px solid #ffffff;
-                    border-radius: 50%;
-                    animation: spin 1s linear infinite;
-                    margin-right: 10px;
-                "></div>
-                <span id="progress-text">Starting Multi-Phase Testing...</span>
-            </div>
-            <div style="display: flex; align-items: center;">
-                <span id="progress-phase" style="
-                    background: rgba(255,255,255,0.2);
-                    padding: 4px 12px;
-                    border-radius: 20px;
-                    margin-right: 10px;
-                    font-size: 12px;
-                ">INITIALIZING</span>
-                <span id="progress-time" style="font-size: 12px; opacity: 0.8;"></span>
-            </div>
-        </div>
-        <style>
-            @keyframes spin {
-                0% { transform: rotate(0deg); }
-                100% { transform: rotate(360deg); }
-            }
-            body { margin-top: 60px !important; }
-        </style>
-        """
-                                
-        self.logger.info("Multi-phase testing agent initialized", 
-                        timestamp=self.timestamp,
-                        project_root=str(self.project_root))
-    
-    def _create_specialized_agents(self):
-        """Create specialized agents for each testing phase."""
-        
-        # Analysis Agent
-        self.agents[TestPhase.ANALYSIS] = {
-            "name": "Web Application Analysis Agent",
-            "instructions": """
-                            You are a specialized Web Application Analysis Agent with expertise in understanding application structure and functionality.
+# Stable instruction templates. Kept at module level so the text sent ahead of
+# every phase prompt is byte-identical across runs and can be served from the
+# provider's prompt prefix cache. _COMMON_INSTRUCTIONS is shared by all four
+# agents and is sent first; the phase templates only hold what differs.
+_COMMON_INSTRUCTIONS = textwrap.dedent("""
+                            You are one of four specialized agents (Analysis, Planning, Execution, Reporting) that together test a web application.
 
                             **IMPORTANT FILE MANAGEMENT**:
-                            - All files MUST be saved to: {self.fs_files_dir}
-                            - Screenshots MUST be saved to: {self.screenshots_dir}
-                            - Use absolute paths, not relative paths
-                            - Create subdirectories as needed for organization
+                                - All files MUST be saved to: {fs_files_dir}
+                                - Screenshots MUST be saved to: {screenshots_dir}
+                                - Use absolute paths, not relative paths
+                                - Create subdirectories as needed for organization
+                                - Load the results of previous phases from the file system
+
+                            **IMPORTANT BROWSER MANAGEMENT** (phases that use the browser):
+                                - Always inject progress indicator at start of each page
+                                - Update progress indicator with current step
+                                - Take screenshots after each major action and of any errors or failures
+                                - Use descriptive screenshot names with timestamps
 
-                            **IMPORTANT BROWSER MANAGEMENT**:
-                            - Always inject progress indicator at start of each page
-                            - Update progress indicator with current step
-                            - Take screenshots after each major action
-                            - Use descriptive screenshot names with timestamps
+                            **Output Format**:
+                            Always structure your output in markdown format, using the sections listed for your phase,
+                            and reference all saved files, screenshots and evidence.
+                            """).strip()
+
+_ANALYSIS_INSTRUCTIONS = textwrap.dedent("""
+                            You are a specialized Web Application Analysis Agent with expertise in understanding application structure and functionality.
 
                             Your primary responsibilities:
                             1. **Application Discovery**:
@@ -181,43 +208,25 @@ class MultiPhaseTestingAgent:
                                 - Document API endpoints if visible
                                 - Note accessibility features
 
-                            4. **Risk Assessment**:
+                            5. **Risk Assessment**:
                                 - Identify critical functionalities requiring thorough testing
                                 - Highlight potential security concerns
                                 - Document complex user interactions
                                 - Note areas prone to errors
 
-                            **Progress Indicator Updates**:
-                                - Update progress text with current action
-                                - Change phase indicator to show current step
-                                - Use JavaScript to update the progress bar
-
-                            **Output Format**:
-                            Always structure your analysis in markdown format with:
-                            - Executive summary
-                            - Application overview
-                            - Feature inventory
-                            - User workflow mapping
-                            - Technical observations
-                            - Risk areas identified
-                            - Recommendations for testing focus
-
-                            Save all screenshots and evidence to the file system for reference.
-                            """
-        }
-        
-        # Planning Agent
-        self.agents[TestPhase.PLANNING] = {
-            "name": "Test Planning and Strategy Agent",
-            "instructions": """
+                            **Output Sections**:
+                                - Executive summary
+                                - Application overview
+                                - Feature inventory
+                                - User workflow mapping
+                                - Technical observations
+                                - Risk areas identified
+                                - Recommendations for testing focus
+                            """).strip()
+
+_PLANNING_INSTRUCTIONS = textwrap.dedent("""
                             You are a specialized Test Planning Agent focused on creating comprehensive test strategies based on application analysis.
 
-                            **IMPORTANT FILE MANAGEMENT**:
-                                - All files MUST be saved to: {self.fs_files_dir}
-                                - Load analysis results from previous phase
-                                - Save test plans, scenarios, and test data files
-                                - Use absolute paths consistently
-
                             Your primary responsibilities:
                             1. **Test Strategy Development**:
                                 - Load and review analysis results from file system
@@ -249,8 +258,7 @@ class MultiPhaseTestingAgent:
                                 - Save test data as: test_data_{{timestamp}}.csv
                                 - Create subdirectories for different test types
 
-                            **Output Format**:
-                            Structure your test plan in markdown format with:
+                            **Output Sections**:
                                 - Test strategy overview
                                 - Scope and objectives
                                 - Test categories and priorities
@@ -258,30 +266,11 @@ class MultiPhaseTestingAgent:
                                 - Test data requirements
                                 - Execution timeline and dependencies
                                 - Success criteria and exit conditions
+                            """).strip()
 
-                            Reference analysis findings and create actionable test specifications.
-                            """
-        }
-        
-        # Execution Agent
-        self.agents[TestPhase.EXECUTION] = {
-            "name": "Test Execution and Automation Agent",
-            "instructions": """
+_EXECUTION_INSTRUCTIONS = textwrap.dedent("""
                             You are a specialized Test Execution Agent responsible for implementing and running all planned test scenarios.
 
-                            **IMPORTANT FILE MANAGEMENT**:
-                                - All files MUST be saved to: {self.fs_files_dir}
-                                - Screenshots MUST be saved to: {self.screenshots_dir}
-                                - Load test plan from previous phase
-                                - Save execution results and evidence
-
-                            **IMPORTANT BROWSER MANAGEMENT**:
-                                - Always inject progress indicator at start
-                                - Update progress indicator for each test case
-                                - Take screenshots before and after each action
-                                - Take screenshot of any errors or failures
-                                - Use descriptive screenshot names
-
                             Your primary responsibilities:
                             1. **Test Environment Setup**:
                                 - Load test plan from file system
@@ -292,28 +281,26 @@ class MultiPhaseTestingAgent:
                             2. **Systematic Test Execution**:
                                 - Execute each test case from the plan
                                 - Update progress indicator with current test
-                                - Take screenshots for each test step
+                                - Take screenshots before and after each test step
                                 - Document results in real-time
 
                             3. **Evidence Collection**:
                                 - Screenshot every page interaction
                                 - Save error screenshots with timestamps
-                                - Log all test results to JSON files
+                                - Append each test result as one JSONL record as soon as it completes
                                 - Document issues with reproduction steps
 
                             4. **Issue Documentation**:
                                 - Create issue reports for failures
                                 - Save evidence for each issue
                                 - Classify by severity and priority
-                                - Save all evidence to file system
 
                             **Screenshot Naming Convention**:
                                 - test_{{test_id}}_step_{{step_number}}_{{timestamp}}.png
                                 - error_{{test_id}}_{{error_type}}_{{timestamp}}.png
                                 - success_{{test_id}}_{{timestamp}}.png
                             
-                            **Output Format**:
-                            Document execution results in markdown format with:
+                            **Output Sections**:
                                 - Execution summary and statistics
                                 - Test results by category
                                 - Detailed step-by-step execution logs
@@ -321,23 +308,11 @@ class MultiPhaseTestingAgent:
                                 - Evidence references (screenshots, logs)
                                 - Performance observations
                                 - Recommendations for fixes
+                            """).strip()
 
-                            Ensure all evidence is properly saved and referenced.
-                            """
-        }
-        
-        # Reporting Agent
-        self.agents[TestPhase.REPORTING] = {
-            "name": "Test Reporting and Analysis Agent",
-            "instructions": """
+_REPORTING_INSTRUCTIONS = textwrap.dedent("""
                             You are a specialized Test Reporting Agent focused on synthesizing all testing phases into comprehensive reports.
 
-                            **IMPORTANT FILE MANAGEMENT**:
-                                - All files MUST be saved to: {self.fs_files_dir}
-                                - Load results from all previous phases
-                                - Save comprehensive reports and metrics
-                                - Reference all saved screenshots and evidence
-
                             Your primary responsibilities:
                             1. **Results Synthesis**:
                                 - Load and review all previous phase results
@@ -375,8 +350,7 @@ class MultiPhaseTestingAgent:
                                 - Save evidence catalog as: evidence_catalog_{{timestamp}}.json
                                 - Create recommendations document
                                 
-                            **Output Format**:
-                            Create comprehensive report in markdown format with:
+                            **Output Sections**:
                                 - Executive summary with key findings
                                 - Test execution metrics and statistics
                                 - Detailed issue analysis with priorities
@@ -384,17 +358,319 @@ class MultiPhaseTestingAgent:
                                 - Actionable recommendations
                                 - Risk mitigation strategies
                                 - Next steps and follow-up actions
+                            """).strip()
+
+# Header of a saved phase report; the phase content follows it directly
+_PHASE_REPORT_HEADER = string.Template("""# $phase_title Phase Report
+
+                **Target URL**: $target_url  
+                **Timestamp**: $now  
+                **Phase**: $phase_title  
+                **Agent**: $agent_name  
+                **Files Directory**: $fs_files_dir  
+                **Screenshots Directory**: $screenshots_dir  
+
+            ---
+
+            """)
+
+# Progress indicator HTML
+_PROGRESS_HTML = """
+        <div id="testing-progress-bar" style="
+            position: fixed;
+            top: 0;
+            left: 0;
+            width: 100%;
+            height: 60px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            z-index: 999999;
+            display: flex;
+            align-items: center;
+            justify-content: space-between;
+            padding: 0 20px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.3);
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            font-size: 14px;
+        ">
+            <div style="display: flex; align-items: center;">
+                <div id="progress-spinner" style="
+                    width: 20px;
+                    height: 20px;
+                    border: 2px solid #ffffff40;
+                    border-top: 2px solid #ffffff;
+                    border-radius: 50%;
+                    animation: spin 1s linear infinite;
+                    margin-right: 10px;
+                "></div>
+                <span id="progress-text">Starting Multi-Phase Testing...</span>
+            </div>
+            <div style="display: flex; align-items: center;">
+                <span id="progress-phase" style="
+                    background: rgba(255,255,255,0.2);
+                    padding: 4px 12px;
+                    border-radius: 20px;
+                    margin-right: 10px;
+                    font-size: 12px;
+                ">INITIALIZING</span>
+                <span id="progress-time" style="font-size: 12px; opacity: 0.8;"></span>
+            </div>
+        </div>
+        <style>
+            @keyframes spin {
+                0% { transform: rotate(0deg); }
+                100% { transform: rotate(360deg); }
+            }
+            body { margin-top: 60px !important; }
+        </style>
+        """
+
+# Progress bar markup with the step text and phase label as substitution slots
+_PROGRESS_HTML_TEMPLATE = string.Template(
+    _PROGRESS_HTML
+    .replace("Starting Multi-Phase Testing...", "$STEP")
+    .replace("INITIALIZING", "$PHASE")
+)
+
+# Phase input bodies, dedented so indentation is not sent as prompt tokens.
+# {run_timestamp} is filled in once per agent instance; {context_data} and
+# {target_url} are filled in per phase run.
+_PHASE_INPUT_TEMPLATES = {
+    TestPhase.ANALYSIS: textwrap.dedent("""
+                                **Objective**: Perform comprehensive analysis with progress tracking and screenshot capture.
+
+                                **Analysis Focus**:
+                                {context_data}
+
+                                **Required Actions**:
+                                1. Navigate to {target_url}
+                                2. Inject progress indicator: "Analyzing application structure..."
+                                3. Take initial screenshot: "homepage_initial"
+                                4. Update progress: "Identifying key features..."
+                                5. Analyze application structure and take screenshots of main sections
+                                6. Update progress: "Documenting findings..."
+                                7. Save analysis results to files
+                                8. Take final screenshot: "analysis_complete"
+
+                                **Expected Deliverables**:
+                                - Homepage screenshot
+                                - Main sections screenshots  
+                                - Analysis data in JSON format
+                                - Comprehensive markdown report
+
+                                Execute these steps systematically with proper progress updates and screenshot capture.
+                                """).strip(),
+    TestPhase.PLANNING: textwrap.dedent("""
+                                **Objective**: Create comprehensive test plan with saved artifacts.
+
+                                **Context from Analysis**:
+                                {context_data}
+
+                                **Required Actions**:
+                                1. Load analysis results from previous phase
+                                2. Create test strategy document
+                                3. Generate detailed test scenarios
+                                4. Create test data files (JSON/CSV)
+                                5. Save test plan to markdown file
+                                6. Save test scenarios to JSON file
+
+                                **Expected Deliverables**:
+                                - test_plan_{run_timestamp}.md
+                                - test_scenarios_{run_timestamp}.json  
+                                - test_data_{run_timestamp}.csv
+                                - Comprehensive planning report
+
+                                Execute systematically and save all artifacts to the file system.
+                                """).strip(),
+    TestPhase.EXECUTION: textwrap.dedent("""
+                                **Objective**: Execute tests with comprehensive evidence collection.
+
+                                **Context from Planning**:
+                                {context_data}
+
+                                **Required Actions**:
+                                1. Load test plan from previous phase
+                                2. Navigate to {target_url}
+                                3. Inject progress indicator: "Starting test execution..."
+                                4. For each test case:
+                                - Update progress indicator with current test
+                                - Take before-action screenshot
+                                - Execute test steps
+                                - Take after-action screenshot
+                                - Document results
+                                5. Append each test case result as it completes to execution_results_{run_timestamp}.jsonl (append_jsonl tool)
+                                6. Create execution report
+
+                                **Screenshot Requirements**:
+                                - Before each test: test_{{id}}_start_{{timestamp}}
+                                - After each action: test_{{id}}_step_{{step}}_{{timestamp}}
+                                - For errors: error_{{id}}_{{timestamp}}
+                                - Final result: test_{{id}}_result_{{timestamp}}
+
+                                Execute all tests systematically with comprehensive evidence collection.
+                                """).strip(),
+    TestPhase.REPORTING: textwrap.dedent("""
+                                **Objective**: Create comprehensive final report with all evidence.
+
+                                **Context from Previous Phases**:
+                                {context_data}
+
+                                **Required Actions**:
+                                1. Load all previous phase results
+                                2. Compile evidence catalog (all screenshots and files)
+                                3. Analyze patterns and metrics
+                                4. Create executive summary
+                                5. Generate final comprehensive report
+                                6. Save metrics and evidence catalog
+
+                                **Expected Deliverables**:
+                                - final_report_{run_timestamp}.md
+                                - test_metrics_{run_timestamp}.json
+                                - evidence_catalog_{run_timestamp}.json
+                                - Executive summary
 
-                            Provide clear, actionable insights for development teams.
-                            """
+                                Provide comprehensive analysis with references to all evidence collected.
+                                """).strip(),
+}
+
+# Phase input context when no previous phase output is passed in
+_DEFAULT_PHASE_CONTEXT = {
+    TestPhase.ANALYSIS: "Entire application",
+    TestPhase.PLANNING: "Load analysis results from file system",
+    TestPhase.EXECUTION: "Load test plan from file system",
+    TestPhase.REPORTING: "Load results from all previous phases",
+}
+
+# Agent name and instruction template per phase
+_PHASE_AGENTS = {
+    TestPhase.ANALYSIS: ("Web Application Analysis Agent", _ANALYSIS_INSTRUCTIONS),
+    TestPhase.PLANNING: ("Test Planning and Strategy Agent", _PLANNING_INSTRUCTIONS),
+    TestPhase.EXECUTION: ("Test Execution and Automation Agent", _EXECUTION_INSTRUCTIONS),
+    TestPhase.REPORTING: ("Test Reporting and Analysis Agent", _REPORTING_INSTRUCTIONS),
+}
+
+class MultiPhaseTestingAgent:
+    """
+    Multi-agent system for comprehensive web application testing.
+    Each phase has its own specialized agent with dedicated responsibilities.
+    """
+    
+    # Resolved once per process instead of on every phase
+    _npx_path: Optional[str] = None
+    
+    # Phases that only read and write text artifacts get in-process file tools
+    # instead of the filesystem MCP server
+    _INTERNAL_FILE_TOOL_PHASES = frozenset({TestPhase.PLANNING, TestPhase.REPORTING})
+    # Phases whose output may be replayed from the semantic prompt cache. Analysis
+    # and Execution drive the browser and produce screenshots and result files,
+    # which a replayed output would only point at from an earlier run
+    _PROMPT_CACHE_PHASES = frozenset({TestPhase.PLANNING, TestPhase.REPORTING})
+    
+    def __init__(self, config: AgentConfig, phase_cache: Optional[PhaseCache] = None,
+                 prompt_cache_path: Optional[Path] = None):
+        self.config = config
+        self.phase_cache = phase_cache
+        self.logger = logger.bind(component="multi_phase_testing_agent")
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+                # Set up proper directory structure
+        self.project_root = Path(__file__).parent.parent.parent  # Go up to project root
+        self.reports_dir = self.project_root / "reports/test_reports"
+        self.fs_files_dir = self.project_root / "reports/fs_files"
+        self.screenshots_dir = self.project_root / "reports/screenshots"
+        
+        # Create directories once; phases only create their own subdirectory
+        for directory in (self.reports_dir, self.fs_files_dir, self.screenshots_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._reports_dir_str = str(self.reports_dir)
+        self._fs_files_dir_str = str(self.fs_files_dir)
+        self._screenshots_dir_str = str(self.screenshots_dir)
+        
+        # Set up Azure OpenAI client
+        self.client = AsyncAzureOpenAI(
+            api_key=config.api_key,
+            azure_endpoint=config.endpoint,
+            api_version=config.api_version,
+            http_client=_get_http_client(),
+        )
+        self._holds_http_client = True
+        
+        set_default_openai_client(self.client)
+        set_tracing_disabled(disabled=True)
+        
+        # Optional semantic cache of Planning and Reporting outputs, keyed by phase template and target
+        self.prompt_cache = None
+        if prompt_cache_path is not None:
+            self.prompt_cache = SemanticCache(
+                self.client,
+                prompt_cache_path,
+                embedding_model=config.embedding_deployment,
+                verification_model=config.deployment_name,
+            )
+
+        # Warm MCP servers shared by all phases, rooted at the files directory
+        if MultiPhaseTestingAgent._npx_path is None:
+            MultiPhaseTestingAgent._npx_path = shutil.which("npx")
+        self.mcp_pool = MCPServerPool(self.fs_files_dir, self._npx_path) if self._npx_path else None
+        
+        # Specialized agents are built lazily, only for the phases that run
+        self._instruction_paths = {"fs_files_dir": self.fs_files_dir, "screenshots_dir": self.screenshots_dir}
+        self.common_instructions = _COMMON_INSTRUCTIONS.format(**self._instruction_paths)
+        self.agents: Dict[TestPhase, Dict[str, str]] = {}
+        
+        self._url_safe_names: Dict[str, str] = {}
+        self._cycle_started_at: Optional[str] = None
+        self._phase_input_templates = {
+            phase: template.replace("{run_timestamp}", self.timestamp)
+            for phase, template in _PHASE_INPUT_TEMPLATES.items()
         }
+        
+        # Progress indicator markup is shared by all instances
+        self.progress_html = _PROGRESS_HTML
+        self._progress_html_template = _PROGRESS_HTML_TEMPLATE
+        
+        self.logger.info("Multi-phase testing agent initialized", 
+                        timestamp=self.timestamp,
+                        project_root=str(self.project_root))
+    
+    async def aclose(self):
+        """
+        Shut down the pooled MCP servers and the prompt cache, release the shared
+        HTTP client. Safe to call more than once.
+        """
+        if self.mcp_pool is not None:
+            await self.mcp_pool.aclose()
+        if self.prompt_cache is not None:
+            self.prompt_cache.close()
+            self.prompt_cache = None
+        if self._holds_http_client:
+            self._holds_http_client = False
+            await _release_http_client()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
     
-    async def _inject_progress_indicator(self, browser_tools, phase: TestPhase, step: str):
-        """Inject progress indicator into the current page."""
+    def _get_agent_spec(self, phase: TestPhase) -> Dict[str, str]:
+        """Build a phase's agent name and instructions on first use."""
+        spec = self.agents.get(phase)
+        if spec is None:
+            name, template = _PHASE_AGENTS[phase]
+            spec = self.agents[phase] = {
+                "name": name,
+                "instructions": template.format(**self._instruction_paths),
+            }
+        return spec
+    
+    async def _install_progress_bar(self, browser_tools, phase: TestPhase, step: str):
+        """Inject the full progress bar markup into the current page; needed once per page load."""
         
-        current_time = datetime.now().strftime("%H:%M:%S")
+        html = self._progress_html_template.substitute(STEP=html_escape(step), PHASE=phase.upper_name)
         
-        # JavaScript to inject/update progress indicator
+        # JavaScript to (re)insert the progress bar; the markup is passed as a JSON
+        # string literal so quotes, backticks or "${" in the step text cannot break it
         js_code = f"""
         // Remove existing progress bar if any
         const existingBar = document.getElementById('testing-progress-bar');
@@ -402,28 +678,31 @@ class MultiPhaseTestingAgent:
             existingBar.remove();
         }}
         
-        // Create new progress bar
-        const progressBar = document.createElement('div');
-        progressBar.innerHTML = `{self.progress_html.replace("Starting Multi-Phase Testing...", step).replace("INITIALIZING", phase.value.upper())}`;
-        document.body.insertAdjacentHTML('afterbegin', progressBar.innerHTML);
+        document.body.insertAdjacentHTML('afterbegin', {json_io.dumps(html)});
+        """
         
-        // Update time
-        const timeElement = document.getElementById('progress-time');
-        if (timeElement) {{
-            timeElement.textContent = '{current_time}';
-        }}
+        try:
+            await browser_tools.evaluate_javascript(js_code)
+        except Exception as e:
+            self.logger.warning("Failed to install progress indicator", error=str(e))
+    
+    async def _inject_progress_indicator(self, browser_tools, phase: TestPhase, step: str, install: bool = False):
+        """
+        Update the progress indicator on the current page.
+        Pass `install=True` after a navigation so the bar markup is injected first.
+        """
         
-        // Update text and phase
-        const textElement = document.getElementById('progress-text');
-        if (textElement) {{
-            textElement.textContent = '{step}';
-        }}
+        if install:
+            await self._install_progress_bar(browser_tools, phase, step)
         
-        const phaseElement = document.getElementById('progress-phase');
-        if (phaseElement) {{
-            phaseElement.textContent = '{phase.value.upper()}';
-        }}
-        """
+        params = {
+            "step": step,
+            "phase": phase.upper_name,
+            "time": datetime.now().strftime("%H:%M:%S"),
+        }
+        
+        # Fixed update function applied to JSON-encoded params (also escapes quotes in `step`)
+        js_code = f"{_PROGRESS_UPDATE_JS}({json_io.dumps(params)});"
         
         try:
             # Execute JavaScript to update progress
@@ -434,22 +713,19 @@ class MultiPhaseTestingAgent:
     async def _take_screenshot(self, browser_tools, filename: str, description: str = ""):
         """Take screenshot and save to proper location."""
         
-        # Ensure screenshots directory exists
-        self.screenshots_dir.mkdir(exist_ok=True)
-        
-        # Create full path
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Include milliseconds
-        screenshot_path = self.screenshots_dir / f"{filename}_{timestamp}.png"
+        # Screenshots directory is created once in __init__
+        timestamp = f"{time.time_ns() // 1_000_000:013d}"  # Epoch milliseconds
+        screenshot_path = os.path.join(self._screenshots_dir_str, f"{_sanitize(filename)}_{timestamp}.png")
         
         try:
             # Take screenshot
-            await browser_tools.take_screenshot(str(screenshot_path))
+            await browser_tools.take_screenshot(screenshot_path)
             
             self.logger.info("Screenshot saved", 
-                            path=str(screenshot_path), 
+                            path=screenshot_path, 
                             description=description)
             
-            return str(screenshot_path)
+            return screenshot_path
             
         except Exception as e:
             self.logger.error("Failed to take screenshot", 
@@ -457,124 +733,225 @@ class MultiPhaseTestingAgent:
                             error=str(e))
             return None
         
-    async def _save_phase_results(self, phase: TestPhase, content: str, target_url: str):
+    async def _save_phase_results(self, phase: TestPhase, content: str, target_url: str,
+                                  label: Optional[str] = None):
         """Save phase results to markdown file with timestamp."""
         
-        # Generate filename with timestamp
-        url_safe = target_url.replace("https://", "").replace("http://", "").replace("/", "_").replace(".", "_")
-        filename = f"{phase.value}_{url_safe}_{self.timestamp}.md"
-        filepath = self.reports_dir / filename
-        
-        # Prepare content with metadata
-        metadata_content = f"""# {phase.value.title()} Phase Report
-
-                **Target URL**: {target_url}  
-                **Timestamp**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}  
-                **Phase**: {phase.value.title()}  
-                **Agent**: {self.agents[phase]['name']}  
-                **Files Directory**: {self.fs_files_dir}  
-                **Screenshots Directory**: {self.screenshots_dir}  
-
-            ---
-
-            {content}
+        filepath = self._phase_report_path(phase, target_url, label)
+        filename = filepath.name
+        now_str = datetime.now().isoformat(sep=" ", timespec="seconds")
+        agent_name = self._get_agent_spec(phase)['name']
+        
+        # Metadata header and footer around the phase content
+        header = _PHASE_REPORT_HEADER.substitute(
+            phase_title=phase.title_name,
+            target_url=target_url,
+            now=now_str,
+            agent_name=agent_name,
+            fs_files_dir=self._fs_files_dir_str,
+            screenshots_dir=self._screenshots_dir_str,
+        )
+        footer = f"""
 
             ---
 
-            *Report generated by {self.agents[phase]['name']} on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}*
+            *Report generated by {agent_name} on {now_str}*
                         """
         
-        # Save to file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(metadata_content)
+        # Write header, content and footer separately so the (possibly large)
+        # content is never copied into one combined string
+        async with aiofiles.open(filepath, 'w', encoding='utf-8') as f:
+            await f.write(header)
+            await f.write(content)
+            await f.write(footer)
         
         self.logger.info("Phase results saved", 
                         phase=phase.value, 
                         filename=filename,
-                        filepath=str(filepath))
+                        filepath=filepath)
         
         return str(filepath)
     
-    async def _execute_phase(self, phase: TestPhase, target_url: str, context_data: Optional[str] = None):
-        """Execute a specific testing phase with dedicated agent."""
+    async def _stream_output_prefix(self, streamed_result, output_prefix: asyncio.Future, prefix_chars: int):
+        """Drain a streamed run, resolving `output_prefix` once `prefix_chars` of output text arrived."""
+        chunks = []
+        received = 0
+        
+        async for event in streamed_result.stream_events():
+            if output_prefix.done():
+                continue
+            
+            # Text emitted before a tool call is narration, not the final output
+            if event.type == "run_item_stream_event" and event.name == "tool_called":
+                chunks.clear()
+                received = 0
+            elif event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                chunks.append(event.data.delta)
+                received += len(event.data.delta)
+                if received >= prefix_chars:
+                    output_prefix.set_result("".join(chunks)[:prefix_chars])
+        
+        if not output_prefix.done():
+            output_prefix.set_result(streamed_result.final_output[:prefix_chars])
+    
+    async def _execute_phase(self, phase: TestPhase, target_url: str, context_data: Optional[str] = None,
+                             static_prefix: Optional[str] = None, dynamic_suffix: Optional[str] = None,
+                             output_prefix: Optional[asyncio.Future] = None, prefix_chars: int = 500,
+                             label: Optional[str] = None):
+        """
+        Execute a specific testing phase with dedicated agent and save its report.
+        See `_run_phase_ai` for the arguments.
+        """
+        phase_result, report_content = await self._run_phase_ai(
+            phase, target_url, context_data, static_prefix, dynamic_suffix,
+            output_prefix, prefix_chars, label
+        )
+        await self._persist_phase(phase, target_url, phase_result, report_content, label)
+        return phase_result
+    
+    async def _persist_phase(self, phase: TestPhase, target_url: str, phase_result: Dict[str, Any],
+                             report_content: str, label: Optional[str] = None):
+        """Write the report of a phase run produced by `_run_phase_ai`."""
+        filepath = await self._save_phase_results(phase, report_content, target_url, label)
+        
+        if phase_result["status"] == "completed":
+            self.logger.info("Enhanced phase execution completed", 
+                            phase=phase.value, 
+                            result_file=filepath)
+    
+    async def _run_phase_ai(self, phase: TestPhase, target_url: str, context_data: Optional[str] = None,
+                            static_prefix: Optional[str] = None, dynamic_suffix: Optional[str] = None,
+                            output_prefix: Optional[asyncio.Future] = None, prefix_chars: int = 500,
+                            label: Optional[str] = None):
+        """
+        Run a testing phase's agent without writing its report.
+
+        Returns the phase result, whose `filepath` is where `_persist_phase` will
+        write the report, and the report content (the output, or an error report).
+
+        `static_prefix` is placed at the head of the agent instructions so that the
+        provider's automatic prompt prefix cache can match it across all phases;
+        `dynamic_suffix` is appended to the tail of the phase input.
+
+        When `output_prefix` is given the run is streamed and the future resolves with
+        the first `prefix_chars` characters of the output while the phase is still
+        running, so a dependent phase can start early. It is cancelled if the phase fails.
+
+        `label` distinguishes concurrent runs of the same phase; it is added to the
+        phase directory and report file names.
+        """
         
-        if not shutil.which("npx"):
+        if self.mcp_pool is None:
             raise RuntimeError("npx not found. Please install Node.js and try again.")
         
         # Create phase-specific directory
-        phase_dir = self.fs_files_dir / f"{phase.value}_{self.timestamp}"
-        phase_dir.mkdir(exist_ok=True)
+        phase_dir = self._get_phase_dir(phase, label)
+        await asyncio.to_thread(phase_dir.mkdir, parents=True, exist_ok=True)
+        
+        deployment_name = self.config.phase_deployments.get(phase) or self.config.deployment_name
         
         self.logger.info("Starting enhanced phase execution", 
                     phase=phase.value, 
                     target_url=target_url,
-                    phase_dir=str(phase_dir))
-        
-        try:
-            async with MCPServerStdio(
-                name="Filesystem Server",
-                params={
-                    "command": "npx",
-                    "args": ["-y", "@modelcontextprotocol/server-filesystem", str(phase_dir)],
-                },
-                cache_tools_list=True
-            ) as file_server, MCPServerStdio(
-                name="Playwright Server",
-                params={
-                    "command": "npx",
-                    "args": ["-y", "@executeautomation/playwright-mcp-server"],
-                },
-                cache_tools_list=True
-            ) as automation_server:
+                    deployment=deployment_name,
+                    phase_dir=phase_dir)
+        
+        # Shared instructions and static requirements first, phase instructions after them
+        agent_spec = self._get_agent_spec(phase)
+        instructions = "\n\n".join(filter(None, [
+            self.common_instructions, static_prefix, agent_spec["instructions"]
+        ]))
+        
+        # Prepare phase-specific input
+        phase_started_at = datetime.now().isoformat(sep=" ", timespec="seconds")
+        phase_input = self._prepare_phase_input(phase, target_url, context_data, dynamic_suffix, label,
+                                                started_at=phase_started_at)
+        
+        ran_agent = False
+        
+        async def run_agent() -> str:
+            nonlocal ran_agent
+            ran_agent = True
+            async with self.mcp_pool.lease() as servers:
+                if phase in self._INTERNAL_FILE_TOOL_PHASES:
+                    tools = build_file_tools(self.fs_files_dir, phase_dir)
+                    mcp_servers = [servers.playwright]
+                else:
+                    tools = build_jsonl_tools(self.fs_files_dir, phase_dir) if phase == TestPhase.EXECUTION else []
+                    mcp_servers = [servers.filesystem, servers.playwright]
                 
                 # Create specialized agent for this phase
                 agent = Agent(
-                    name=self.agents[phase]["name"],
-                    instructions=self.agents[phase]["instructions"],
-                    mcp_servers=[file_server, automation_server],
+                    name=agent_spec["name"],
+                    instructions=instructions,
+                    tools=tools,
+                    mcp_servers=mcp_servers,
                     model=OpenAIChatCompletionsModel(
-                        model=self.config.deployment_name,
+                        model=deployment_name,
                         openai_client=self.client
-                    )
+                    ),
+                    # Stable cache key pins requests of one target to the same prefix cache
+                    model_settings=ModelSettings(extra_body={"prompt_cache_key": target_url})
                 )
                 
-                # Prepare phase-specific input
-                phase_input = self._prepare_phase_input(phase, target_url, context_data)
-                
                 # Execute the phase
-                result  = await Runner.run(
-                    starting_agent=agent,
-                    input=phase_input,
-                    max_turns=100
-                )
-                
-                # Save results to markdown file
-                filepath = await self._save_phase_results(phase, result.final_output, target_url)
-                
-                self.logger.info("Enhanced phase execution completed", 
-                                phase=phase.value, 
-                                result_file=filepath,
-                                files_created=list(phase_dir.glob("*")))
+                if output_prefix is None:
+                    result = await Runner.run(
+                        starting_agent=agent,
+                        input=phase_input,
+                        max_turns=100
+                    )
+                else:
+                    result = Runner.run_streamed(
+                        starting_agent=agent,
+                        input=phase_input,
+                        max_turns=100
+                    )
+                    await self._stream_output_prefix(result, output_prefix, prefix_chars)
                 
-                return {
-                    "phase": phase.value,
-                    "status": "completed",
-                    "result": result.final_output,
-                    "filepath": filepath,
-                    "phase_dir": str(phase_dir),
-                    "timestamp": self.timestamp
-                }
+                return result.final_output
+        
+        try:
+            if self.prompt_cache is None or phase not in self._PROMPT_CACHE_PHASES:
+                final_output = await run_agent()
+            else:
+                # Template, static requirements and run label are matched exactly; only
+                # the variable slots are compared semantically, so the long shared
+                # requirements block cannot make different inputs look alike
+                template_hash = PhaseCache.hash_text(agent_spec["instructions"])
+                prefix_hash = PhaseCache.hash_text(static_prefix)
+                final_output = await self.prompt_cache.get_or_compute(
+                    scope=f"{phase.value}:{template_hash}:{prefix_hash}:{label or ''}:{target_url}",
+                    text="\n\n".join(filter(None, [context_data, dynamic_suffix])) or phase.value,
+                    compute=run_agent,
+                )
+                if output_prefix is not None and not output_prefix.done():
+                    output_prefix.set_result(final_output[:prefix_chars])
+            
+            return {
+                "phase": phase.value,
+                "status": "completed",
+                "result": final_output,
+                "filepath": str(self._phase_report_path(phase, target_url, label)),
+                "phase_dir": str(phase_dir),
+                # Output replayed from the prompt cache; the agent did not run
+                "cached": not ran_agent,
+                "timestamp": self.timestamp
+            }, final_output
                 
         except Exception as e:
             self.logger.error("Phase execution failed", phase=phase.value, error=str(e))
+            if output_prefix is not None and not output_prefix.done():
+                output_prefix.cancel()
             
             # Save error to file
-            error_content = f"""# ERROR in {phase.value.title()} Phase
+            phase_dir_str = str(phase_dir)
+            error_content = f"""# ERROR in {phase.title_name} Phase
 
                 **Error**: {str(e)}  
-                **Timestamp**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}  
-                **Phase Directory**: {phase_dir}  
-                **Screenshots Directory**: {self.screenshots_dir}  
+                **Phase Started**: {phase_started_at}  
+                **Phase Directory**: {phase_dir_str}  
+                **Screenshots Directory**: {self._screenshots_dir_str}  
 
                 ## Error Details
                 ```
@@ -582,10 +959,10 @@ class MultiPhaseTestingAgent:
                 ```
 
                 ## File System Status
-                - Reports Directory: {self.reports_dir} (exists: {self.reports_dir.exists()})
-                - Files Directory: {self.fs_files_dir} (exists: {self.fs_files_dir.exists()})
-                - Screenshots Directory: {self.screenshots_dir} (exists: {self.screenshots_dir.exists()})
-                - Phase Directory: {phase_dir} (exists: {phase_dir.exists()})
+                - Reports Directory: {self._reports_dir_str} (exists: {_path_exists_cached(self._reports_dir_str)})
+                - Files Directory: {self._fs_files_dir_str} (exists: {_path_exists_cached(self._fs_files_dir_str)})
+                - Screenshots Directory: {self._screenshots_dir_str} (exists: {_path_exists_cached(self._screenshots_dir_str)})
+                - Phase Directory: {phase_dir_str} (exists: {_path_exists_cached(phase_dir_str)})
 
                 ## Recommendations
                 1. Check MCP server connectivity and file permissions
@@ -594,143 +971,244 @@ class MultiPhaseTestingAgent:
                 4. Check Node.js and npx installation
                 5. Verify directory write permissions
                 """
-            filepath = await self._save_phase_results(phase, error_content, target_url)
-            
             return {
                 "phase": phase.value,
                 "status": "failed",
                 "error": str(e),
-                "filepath": filepath,
-                "phase_dir": str(phase_dir),
+                "filepath": str(self._phase_report_path(phase, target_url, label)),
+                "phase_dir": phase_dir_str,
                 "timestamp": self.timestamp
-            }
+            }, error_content
     
-    def _prepare_phase_input(self, phase: TestPhase, target_url: str, context_data: Optional[str] = None) -> str:
-        """Prepare phase-specific input prompts."""
-        
-        base_input = f"""
-                    **Target Application**: {target_url}
-                    **Current Phase**: {phase.value.title()}
-                    **Timestamp**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-                    **Phase Directory**: {self.fs_files_dir}/{phase.value}_{self.timestamp}
-                    **Screenshots Directory**: {self.screenshots_dir}
-
-                    """
-        
-        if phase == TestPhase.ANALYSIS:
-            return base_input + f"""
-                                **Objective**: Perform comprehensive analysis with progress tracking and screenshot capture.
-
-                                **Required Actions**:
-                                1. Navigate to {target_url}
-                                2. Inject progress indicator: "Analyzing application structure..."
-                                3. Take initial screenshot: "homepage_initial"
-                                4. Update progress: "Identifying key features..."
-                                5. Analyze application structure and take screenshots of main sections
-                                6. Update progress: "Documenting findings..."
-                                7. Save analysis results to files
-                                8. Take final screenshot: "analysis_complete"
-
-                                **Expected Deliverables**:
-                                - Homepage screenshot
-                                - Main sections screenshots  
-                                - Analysis data in JSON format
-                                - Comprehensive markdown report
-
-                                Execute these steps systematically with proper progress updates and screenshot capture.
-                                """
-        
-        elif phase == TestPhase.PLANNING:
-            return base_input + f"""
-                                **Objective**: Create comprehensive test plan with saved artifacts.
-
-                                **Context from Analysis**:
-                                {context_data if context_data else "Load analysis results from file system"}
-
-                                **Required Actions**:
-                                1. Load analysis results from previous phase
-                                2. Create test strategy document
-                                3. Generate detailed test scenarios
-                                4. Create test data files (JSON/CSV)
-                                5. Save test plan to markdown file
-                                6. Save test scenarios to JSON file
-
-                                **Expected Deliverables**:
-                                - test_plan_{self.timestamp}.md
-                                - test_scenarios_{self.timestamp}.json  
-                                - test_data_{self.timestamp}.csv
-                                - Comprehensive planning report
+    def _phase_report_path(self, phase: TestPhase, target_url: str, label: Optional[str] = None) -> Path:
+        """Report file of a phase run; known before the report is written."""
+        label_part = f"_{_sanitize(label)}" if label else ""
+        return self.reports_dir / f"{phase.value}{label_part}_{self._url_safe(target_url)}_{self.timestamp}.md"
+    
+    def _url_safe(self, target_url: str) -> str:
+        """File-name form of a target URL, computed once per URL."""
+        url_safe = self._url_safe_names.get(target_url)
+        if url_safe is None:
+            url_safe = _sanitize(target_url.split("://", 1)[-1])
+            self._url_safe_names[target_url] = url_safe
+        return url_safe
+    
+    def _count_agent_artifacts(self) -> Dict[str, int]:
+        """Count the screenshots and data files written by the agents through MCP."""
+        return {
+            "screenshots": _count_files(self.screenshots_dir, ".png"),
+            "files": _count_files(self.fs_files_dir, recursive=True),
+        }
+    
+    def _get_phase_dir(self, phase: TestPhase, label: Optional[str] = None) -> Path:
+        label_part = f"_{_sanitize(label)}" if label else ""
+        return self.fs_files_dir / f"{phase.value}_{self.timestamp}{label_part}"
+    
+    def _prepare_phase_input(self, phase: TestPhase, target_url: str, context_data: Optional[str] = None,
+                             dynamic_suffix: Optional[str] = None, label: Optional[str] = None,
+                             started_at: Optional[str] = None) -> str:
+        """
+        Prepare phase-specific input prompts.
 
-                                Execute systematically and save all artifacts to the file system.
-                                """
+        Run-specific values (target, timestamp, directories) are kept at the tail of
+        the prompt so they never break a shared cached prefix.
+        """
         
-        elif phase == TestPhase.EXECUTION:
-            return base_input + f"""
-                                **Objective**: Execute tests with comprehensive evidence collection.
+        base_input = (
+            f"\n\n**Target Application**: {target_url}\n"
+            f"**Current Phase**: {phase.title_name}\n"
+            f"**Timestamp**: {started_at or datetime.now().isoformat(sep=' ', timespec='seconds')}\n"
+            f"**Phase Directory**: {self._get_phase_dir(phase, label)} (save this phase's files here; "
+            f"earlier phases' files are in sibling directories)\n"
+            f"**Screenshots Directory**: {self.screenshots_dir}\n"
+        )
+        if dynamic_suffix:
+            base_input += f"{dynamic_suffix}\n"
+        
+        template = self._phase_input_templates.get(phase)
+        if template is None:
+            return base_input
+        return template.format_map({
+            "context_data": context_data or _DEFAULT_PHASE_CONTEXT[phase],
+            "target_url": target_url,
+        }) + base_input
+    
+    async def _execute_analysis_fan_out(self, target_url: str, focus_areas: List[str],
+                                        static_prefix: Optional[str] = None,
+                                        dynamic_suffix: Optional[str] = None,
+                                        max_concurrency: int = 4) -> Dict[str, Any]:
+        """
+            Analyze each focus area with its own concurrent Analysis run and merge the
+            outputs into a single analysis phase result. `max_concurrency` bounds the
+            number of simultaneous runs to stay within the deployment's rate limits.
 
-                                **Context from Planning**:
-                                {context_data if context_data else "Load test plan from file system"}
+            If only some areas fail, the result has status "partial": it keeps the
+            merged output of the areas that succeeded and lists the failed ones.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def analyze(index: int, focus_area: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._execute_phase(TestPhase.ANALYSIS, target_url, focus_area,
+                                                 static_prefix=static_prefix,
+                                                 dynamic_suffix=dynamic_suffix,
+                                                 label=f"area{index}")
+        
+        analyses = await asyncio.gather(*(analyze(i, area) for i, area in enumerate(focus_areas, 1)))
+        
+        sections = [
+            f"## Focus Area: {area}\n\n{analysis['result']}"
+            for area, analysis in zip(focus_areas, analyses)
+            if analysis["status"] == "completed"
+        ]
+        failed = [(area, analysis) for area, analysis in zip(focus_areas, analyses)
+                  if analysis["status"] != "completed"]
+        if failed:
+            sections.append("## Failed Focus Areas\n\n" + "\n".join(
+                f"- {area}: {analysis.get('error', 'Unknown error')} (report: {analysis['filepath']})"
+                for area, analysis in failed
+            ))
+        merged = "\n\n".join(sections)
+        filepath = await self._save_phase_results(TestPhase.ANALYSIS, merged, target_url)
+        
+        if not failed:
+            status = "completed"
+        else:
+            status = "partial" if len(failed) < len(focus_areas) else "failed"
+        phase_result = {
+            "phase": TestPhase.ANALYSIS.value,
+            "status": status,
+            "result": merged,
+            "filepath": filepath,
+            # One directory per focus-area run
+            "phase_dir": ", ".join(analysis["phase_dir"] for analysis in analyses),
+            "focus_area_results": analyses,
+            "timestamp": self.timestamp
+        }
+        if failed:
+            phase_result["error"] = (f"{len(failed)} of {len(focus_areas)} focus-area analyses failed: "
+                                     f"{', '.join(area for area, _ in failed)}")
+        return phase_result
+    
+    async def stream_testing_cycle(self, target_url: str,
+                                   requirements: Optional[str] = None,
+                                   dynamic_suffix: Optional[str] = None,
+                                   fan_out_analysis: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+            Execute the testing phases in order, yielding each phase result as soon
+            as that phase finishes. Pass the collected results to
+            `finalize_testing_cycle` to determine the overall status and save the summary.
 
-                                **Required Actions**:
-                                1. Load test plan from previous phase
-                                2. Navigate to {target_url}
-                                3. Inject progress indicator: "Starting test execution..."
-                                4. For each test case:
-                                - Update progress indicator with current test
-                                - Take before-action screenshot
-                                - Execute test steps
-                                - Take after-action screenshot
-                                - Document results
-                                5. Save execution results to JSON
-                                6. Create execution report
+            With `fan_out_analysis`, the numbered focus areas in `requirements` are
+            analyzed concurrently instead of in one Analysis run.
 
-                                **Screenshot Requirements**:
-                                - Before each test: test_{{id}}_start_{{timestamp}}
-                                - After each action: test_{{id}}_step_{{step}}_{{timestamp}}
-                                - For errors: error_{{id}}_{{timestamp}}
-                                - Final result: test_{{id}}_result_{{timestamp}}
+            With a `phase_cache`, phases whose inputs and upstream output are unchanged
+            are replayed from disk instead of re-running their agents.
 
-                                Execute all tests systematically with comprehensive evidence collection.
-                                """
+            Phase reports are written in the background while later phases run; all
+            of them are on disk once the iteration has finished. A phase whose report
+            could not be written is downgraded to status "error" at that point, so the
+            results passed to `finalize_testing_cycle` reflect it.
+        """
+        context_data = None
+        self._cycle_started_at = datetime.now().isoformat(sep=" ", timespec="seconds")
+        focus_areas = _FOCUS_AREA_RE.findall(requirements) if fan_out_analysis and requirements else []
+        requirements_hash = PhaseCache.hash_text(f"{requirements or ''}\n{dynamic_suffix or ''}")
+        upstream_hash = ""
+        results_log = self.reports_dir / f"phase_results_{self.timestamp}.jsonl"
+        
+        # Reports and cache entries are written by background tasks, so each
+        # phase's disk work overlaps the next phase's agent run
+        persist_tasks: List[asyncio.Task] = []
+        persisted_results: List[Dict[str, Any]] = []
         
-        elif phase == TestPhase.REPORTING:
-            return base_input + f"""
-                                **Objective**: Create comprehensive final report with all evidence.
-
-                                **Context from Previous Phases**:
-                                {context_data if context_data else "Load results from all previous phases"}
-
-                                **Required Actions**:
-                                1. Load all previous phase results
-                                2. Compile evidence catalog (all screenshots and files)
-                                3. Analyze patterns and metrics
-                                4. Create executive summary
-                                5. Generate final comprehensive report
-                                6. Save metrics and evidence catalog
-
-                                **Expected Deliverables**:
-                                - final_report_{self.timestamp}.md
-                                - test_metrics_{self.timestamp}.json
-                                - evidence_catalog_{self.timestamp}.json
-                                - Executive summary
-
-                                Provide comprehensive analysis with references to all evidence collected.
-                                """        
-        return base_input
+        try:
+            # Execute each phase sequentially
+            for phase in [TestPhase.ANALYSIS, TestPhase.PLANNING, TestPhase.EXECUTION, TestPhase.REPORTING]:
+                progress.info(f"\n--- Starting {phase.title_name} Phase ---")
+                
+                cache_key = None
+                cached_result = None
+                if self.phase_cache is not None:
+                    cache_key = PhaseCache.make_key(phase.value, target_url, requirements_hash, upstream_hash)
+                    cached_result = await asyncio.to_thread(self.phase_cache.get, cache_key)
+                
+                report_content = None
+                try:
+                    if cached_result is not None:
+                        progress.info(f"♻️ Reusing cached {phase.title_name} Phase result")
+                        phase_result = cached_result
+                    elif phase == TestPhase.ANALYSIS and focus_areas:
+                        phase_result = await self._execute_analysis_fan_out(target_url, focus_areas,
+                                                                            static_prefix=requirements,
+                                                                            dynamic_suffix=dynamic_suffix)
+                    else:
+                        phase_result, report_content = await self._run_phase_ai(phase, target_url, context_data,
+                                                                                static_prefix=requirements,
+                                                                                dynamic_suffix=dynamic_suffix)
+                    # A partial fan-out Analysis still passes on the areas that succeeded
+                    if phase_result["status"] in ("completed", "partial"):
+                        context_data = f"Previous phase results: {_summarize_for_context(phase_result['result'])}"
+                        
+                except Exception as e:
+                    phase_result = {
+                        "phase": phase.value,
+                        "status": "error",
+                        "error": str(e)
+                    }
+                
+                upstream_hash = PhaseCache.hash_text(phase_result.get("result"))
+                
+                store_key = cache_key if cached_result is None and phase_result["status"] == "completed" else None
+                persist_tasks.append(asyncio.create_task(self._persist_cycle_phase(
+                    phase, target_url, phase_result, report_content, results_log, store_key
+                )))
+                persisted_results.append(phase_result)
+                yield phase_result
+        finally:
+            # Every report must be on disk before the caller writes the cycle summary
+            if persist_tasks:
+                outcomes = await asyncio.gather(*persist_tasks, return_exceptions=True)
+                for phase_result, outcome in zip(persisted_results, outcomes):
+                    if isinstance(outcome, BaseException):
+                        errors = filter(None, [phase_result.get("error"), f"Failed to save phase results: {outcome}"])
+                        phase_result["status"] = "error"
+                        phase_result["error"] = "; ".join(errors)
     
-    async def run_complete_testing_cycle(self, target_url: str, 
-                                       requirements: Optional[str] = None) -> Dict[str, Any]:
+    async def _persist_cycle_phase(self, phase: TestPhase, target_url: str, phase_result: Dict[str, Any],
+                                   report_content: Optional[str], results_log: Path,
+                                   cache_key: Optional[str]):
         """
-            Execute complete testing cycle with enhanced features.
+        Persist one streamed phase: its report (when not yet written), then the
+        results log line and, with a `cache_key`, the phase cache entry.
+        A failed report write is re-raised for `stream_testing_cycle` to collect;
+        the log line and cache entry are best-effort.
         """
-        print(f"🚀 Enhanced Multi-Phase Testing Agent | {self.timestamp}")
-        print(f"📁 Project Root: {self.project_root}")
-        print(f"📊 Reports: {self.reports_dir}")
-        print(f"📁 Files: {self.fs_files_dir}")
-        print(f"📸 Screenshots: {self.screenshots_dir}")
-        print(f"🎯 Target: {target_url}")
-        print("=" * 80)
+        if report_content is not None:
+            try:
+                await self._persist_phase(phase, target_url, phase_result, report_content)
+            except Exception as e:
+                self.logger.error("Failed to save phase results", phase=phase.value, error=str(e))
+                raise
         
+        try:
+            # One line per finished phase, so partial cycles still leave a record; the
+            # log line and the cache entry are independent and written concurrently
+            writes = [asyncio.to_thread(json_io.append_jsonl, results_log, phase_result, str)]
+            if cache_key is not None:
+                writes.append(asyncio.to_thread(self.phase_cache.put, cache_key, phase_result))
+            await asyncio.gather(*writes)
+        except Exception as e:
+            self.logger.warning("Failed to persist phase result", phase=phase.value, error=str(e))
+    
+    async def finalize_testing_cycle(self, target_url: str,
+                                     phase_results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+            Determine the overall status of a cycle from its phase results and save the summary.
+
+            The status is derived from the phase results only, so phases downgraded
+            after they were yielded (e.g. a failed report write) are accounted for.
+        """
         results = {
             "target_url": target_url,
             "timestamp": self.timestamp,
@@ -738,73 +1216,82 @@ class MultiPhaseTestingAgent:
             "reports_dir": str(self.reports_dir),
             "fs_files_dir": str(self.fs_files_dir),
             "screenshots_dir": str(self.screenshots_dir),
-            "phases": {},
+            "phases": phase_results,
             "overall_status": "in_progress"
         }
         
-        
-        context_data = requirements
-        
-        # Execute each phase sequentially
-        for phase in [TestPhase.ANALYSIS, TestPhase.PLANNING, TestPhase.EXECUTION, TestPhase.REPORTING]:
-            print(f"\n--- Starting {phase.value.title()} Phase ---")
-            
-            try:
-                phase_result = await self._execute_phase(phase, target_url, context_data)
-                results["phases"][phase.value] = phase_result
-                
-                if phase_result["status"] == "completed":
-                    context_data = f"Previous phase results: {phase_result['result'][:1000]}..."
-                    print(f"✅ {phase.value.title()} Phase completed")
-                    print(f"   📄 Report: {phase_result['filepath']}")
-                    print(f"   📁 Files: {phase_result['phase_dir']}")
-                else:
-                    print(f"❌ {phase.value.title()} Phase failed: {phase_result.get('error', 'Unknown error')}")
-                    
-            except Exception as e:
-                print(f"💥 {phase.value.title()} Phase error: {str(e)}")
-                results["phases"][phase.value] = {
-                    "phase": phase.value,
-                    "status": "error",
-                    "error": str(e)
-                }
-        
         # Determine overall status
-        if all(p.get("status") == "completed" for p in results["phases"].values()):
+        if all(p.get("status") == "completed" for p in phase_results.values()):
             results["overall_status"] = "completed"
-            print(f"\n🎉 Complete testing cycle finished successfully!")
+            progress.info("\n🎉 Complete testing cycle finished successfully!")
         else:
             results["overall_status"] = "partial"
-            print(f"\n⚠️ Testing cycle completed with some issues.")
+            progress.info("\n⚠️ Testing cycle completed with some issues.")
         
         # Save summary
+        results["artifact_counts"] = await asyncio.to_thread(self._count_agent_artifacts)
         summary_path = await self._save_cycle_summary(results)
         results["summary_file"] = summary_path
         
         # Show final file structure
-        print(f"\n📁 Generated File Structure:")
-        print(f"   Reports: {len(list(self.reports_dir.glob('*.md')))} files")
-        print(f"   Screenshots: {len(list(self.screenshots_dir.glob('*.png')))} files")
-        print(f"   Data Files: {len(list(self.fs_files_dir.rglob('*')))} files")
+        progress.info(f"\n📁 Generated File Structure:\n"
+                      f"   Reports: {len(phase_results)} phase reports + summary\n"
+                      f"   Screenshots: {results['artifact_counts']['screenshots']} files\n"
+                      f"   Data Files: {results['artifact_counts']['files']} files")
 
         return results
     
+    async def run_complete_testing_cycle(self, target_url: str, 
+                                       requirements: Optional[str] = None,
+                                       dynamic_suffix: Optional[str] = None) -> Dict[str, Any]:
+        """
+            Execute complete testing cycle with enhanced features.
+
+            `requirements` should be static text: it is sent as the leading prompt
+            block of every phase. Run-specific text belongs in `dynamic_suffix`.
+        """
+        progress.info(f"🚀 Enhanced Multi-Phase Testing Agent | {self.timestamp}\n"
+                      f"📁 Project Root: {self.project_root}\n"
+                      f"📊 Reports: {self.reports_dir}\n"
+                      f"📁 Files: {self.fs_files_dir}\n"
+                      f"📸 Screenshots: {self.screenshots_dir}\n"
+                      f"🎯 Target: {target_url}\n"
+                      + "=" * 80)
+        
+        phase_results = {}
+        async for phase_result in self.stream_testing_cycle(target_url, requirements, dynamic_suffix):
+            phase_name = phase_result["phase"].title()
+            phase_results[phase_result["phase"]] = phase_result
+            
+            if phase_result["status"] == "completed":
+                progress.info(f"✅ {phase_name} Phase completed\n"
+                              f"   📄 Report: {phase_result['filepath']}\n"
+                              f"   📁 Files: {phase_result['phase_dir']}")
+            elif phase_result["status"] == "partial":
+                progress.info(f"⚠️ {phase_name} Phase partially completed: {phase_result['error']}\n"
+                              f"   📄 Report: {phase_result['filepath']}")
+            elif phase_result["status"] == "error":
+                progress.info(f"💥 {phase_name} Phase error: {phase_result['error']}")
+            else:
+                progress.info(f"❌ {phase_name} Phase failed: {phase_result.get('error', 'Unknown error')}")
+        
+        return await self.finalize_testing_cycle(target_url, phase_results)
+    
     async def _save_cycle_summary(self, results: Dict[str, Any]) -> str:
         """Save enhanced cycle summary with file references."""
         
-        url_safe = results["target_url"].replace("https://", "").replace("http://", "").replace("/", "_").replace(".", "_")
+        url_safe = self._url_safe(results["target_url"])
         filename = f"SUMMARY_{url_safe}_{self.timestamp}.md"
         filepath = self.reports_dir / filename
         
-        # Count files generated
-        screenshots_count = len(list(self.screenshots_dir.glob("*.png")))
-        files_count = len(list(self.fs_files_dir.rglob("*")))
-        
-        summary_content = f"""# Enhanced Testing Cycle Summary
+        # Collect the summary in parts and join once instead of repeated +=
+        parts: List[str] = []
+        parts.append(f"""# Enhanced Testing Cycle Summary
         
                                 **Target URL**: {results['target_url']}  
                                 **Timestamp**: {results['timestamp']}  
                                 **Overall Status**: {results['overall_status']}  
+                                **Cycle Started**: {self._cycle_started_at}  
                                 **Project Root**: {results['project_root']}  
 
                                 ## File Structure
@@ -813,26 +1300,26 @@ class MultiPhaseTestingAgent:
                                 - **Screenshots Directory**: {results['screenshots_dir']}
 
                                 ## Files Generated
-                                - **Screenshots**: {screenshots_count} files
-                                - **Data Files**: {files_count} files
+                                - **Screenshots**: {results['artifact_counts']['screenshots']} files
+                                - **Data Files**: {results['artifact_counts']['files']} files
                                 - **Reports**: {len(results['phases'])} phase reports
 
                                 ## Phase Results
 
-                                """
+                                """)
         
         for phase_name, phase_result in results["phases"].items():
-            status_icon = "✅" if phase_result.get("status") == "completed" else "❌"
-            summary_content += f"""### {status_icon} {phase_name.title()} Phase
+            status_icon = STATUS_ICONS.get(phase_result.get("status"), "❌")
+            parts.append(f"""### {status_icon} {phase_name.title()} Phase
                                     - **Status**: {phase_result.get('status', 'unknown')}
                                     - **Report File**: {phase_result.get('filepath', 'N/A')}
                                     - **Phase Directory**: {phase_result.get('phase_dir', 'N/A')}
-                                    """
+                                    """)
             if phase_result.get("error"):
-                summary_content += f"- **Error**: {phase_result['error']}\n"
-            summary_content += "\n"
+                parts.append(f"- **Error**: {phase_result['error']}\n")
+            parts.append("\n")
         
-        summary_content += f"""
+        parts.append(f"""
                                     ## Evidence Collected
                                     - All screenshots saved to: {self.screenshots_dir}
                                     - All data files saved to: {self.fs_files_dir}
@@ -848,15 +1335,37 @@ class MultiPhaseTestingAgent:
 
                             ---
 
-                            *Summary generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}*
-                            """
+                            *Summary generated on {datetime.now().isoformat(sep=" ", timespec="seconds")}*
+                            """)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(summary_content)
+        async with aiofiles.open(filepath, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            await f.write("".join(parts))
         
         return filepath
 
 
+# # Response schemas for AITestAgent: the model's JSON is parsed and validated in
+# # one pass (pydantic-core) instead of json.loads plus .get() guards.
+# class Workflow(BaseModel):
+#     name: str
+#     steps: List[str]
+#     critical: bool = False
+
+
+# class TestableComponent(BaseModel):
+#     component: str
+#     location: str
+#     test_scenarios: List[str]
+
+
+# class ApplicationAnalysis(BaseModel):
+#     application_type: str
+#     key_features: List[str]
+#     user_workflows: List[Workflow]
+#     testable_components: List[TestableComponent]
+#     risk_areas: List[str]
+
+
 # class AITestAgent:
 #     """
 #     Autonomous AI agent that can analyze web applications,
@@ -868,18 +1377,24 @@ class MultiPhaseTestingAgent:
 #         self.mcp_client = mcp_client
 #         self.logger = logger.bind(component="ai_agent")
         
+#         if config.provider not in (AIProvider.AZURE_OPENAI, AIProvider.OPENAI, AIProvider.ANTHROPIC):
+#             raise ValueError(f"Unsupported AI provider: {config.provider}")
+        
+#         # All providers share the module's HTTP/2 connection pool (see _get_http_client);
+#         # the reference is released in aclose()
+#         http_client = _get_http_client()
+#         self._holds_http_client = True
 #         if config.provider == AIProvider.AZURE_OPENAI:
 #             self.client = AsyncAzureOpenAI(
 #                     api_key=config.api_key,
 #                     azure_endpoint=config.endpoint,
 #                     api_version=config.api_version,
+#                     http_client=http_client,
 #                 )
 #         elif config.provider == AIProvider.OPENAI:
-#             self.client = OpenAI(api_key=config.api_key)
-#         elif config.provider == AIProvider.ANTHROPIC:
-#             self.client = Anthropic(api_key=config.api_key)
+#             self.client = AsyncOpenAI(api_key=config.api_key, http_client=http_client)
 #         else:
-#             raise ValueError(f"Unsupported AI provider: {config.provider}")
+#             self.client = AsyncAnthropic(api_key=config.api_key, http_client=http_client)
     
 
 #     async def analyze_application(self, url: str, analysis_depth: str = "standard") -> Dict[str, Any]:
@@ -920,13 +1435,14 @@ class MultiPhaseTestingAgent:
 #         """
         
 #         response = await self._call_ai(analysis_prompt)
-#         analysis = json.loads(response)
+#         # Raises pydantic.ValidationError if the response does not match the schema
+#         analysis = ApplicationAnalysis.model_validate_json(response)
         
 #         self.logger.info("Application analysis completed", 
-#                         features_found=len(analysis.get("key_features", [])),
-#                         workflows_identified=len(analysis.get("user_workflows", [])))
+#                         features_found=len(analysis.key_features),
+#                         workflows_identified=len(analysis.user_workflows))
         
-#         return analysis
+#         return analysis.model_dump()
     
 #     async def generate_test_plan(self, application_analysis: Dict[str, Any], 
 #                                test_requirements: Optional[Dict[str, Any]] = None) -> TestPlan:
@@ -1003,7 +1519,8 @@ class MultiPhaseTestingAgent:
 #         result = TestResult(
 #             test_id=test_case.test_id,
 #             name=test_case.name,
-#             status="running"
+#             status="running",
+#             start_time_ns=time.monotonic_ns()
 #         )
         
 #         try:
@@ -1025,12 +1542,13 @@ class MultiPhaseTestingAgent:
 #             result.failure_reason = str(e)
 #             self.logger.error("Test case execution failed", test_id=test_case.test_id, error=str(e))
         
-#         result.end_time = asyncio.get_event_loop().time()
+#         # Integer monotonic clock: no event loop lookup, no float drift on long runs
+#         result.end_time_ns = time.monotonic_ns()
         
 #         self.logger.info("Test case completed", 
 #                         test_id=test_case.test_id, 
 #                         status=result.status,
-#                         duration=result.duration)
+#                         duration_ms=(result.end_time_ns - result.start_time_ns) / 1e6)
         
 #         return result
     
@@ -1075,7 +1593,7 @@ class MultiPhaseTestingAgent:
 #         """Make API call to the configured AI provider."""
 #         try:
 #             if self.config.provider == AIProvider.OPENAI:
-#                 response = await self.client.chat.completions.acreate(
+#                 response = await self.client.chat.completions.create(
 #                     model=self.config.model,
 #                     messages=[{"role": "user", "content": prompt}],
 #                     max_tokens=self.config.max_tokens,
@@ -1095,3 +1613,15 @@ class MultiPhaseTestingAgent:
 #         except Exception as e:
 #             self.logger.error("AI API call failed", error=str(e))
 #             raise
+    
+#     async def aclose(self):
+#         """Release the shared HTTP client. Safe to call more than once."""
+#         if self._holds_http_client:
+#             self._holds_http_client = False
+#             await _release_http_client()
+    
+#     async def __aenter__(self):
+#         return self
+    
+#     async def __aexit__(self, exc_type, exc, tb):
+#         await self.aclose()
@@ -0,0 +1,118 @@
+import asyncio
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Callable, List
+
+import aiofiles
+from agents import FunctionTool, function_tool
+
+from . import json_io
+
+
+def _path_resolver(fs_root: Path, phase_dir: Path) -> Callable[[str], Path]:
+    """Resolve relative paths against `phase_dir` and reject paths outside `fs_root`."""
+    root = Path(fs_root).resolve()
+    base = Path(phase_dir)
+
+    def resolve(path: str) -> Path:
+        candidate = Path(path)
+        if not candidate.is_absolute():
+            candidate = base / candidate
+        candidate = candidate.resolve()
+        if not candidate.is_relative_to(root):
+            raise ValueError(f"Path is outside the files directory {root}: {path}")
+        return candidate
+
+    return resolve
+
+
+def build_jsonl_tools(fs_root: Path, phase_dir: Path) -> List[FunctionTool]:
+    """
+    Tool for appending result records to a JSONL file as they are produced.
+
+    Used alongside the filesystem MCP server by phases that log many results,
+    so each record is written once instead of rewriting a growing JSON list.
+    """
+    resolve = _path_resolver(fs_root, phase_dir)
+
+    @function_tool
+    async def append_jsonl(path: str, record: str) -> str:
+        """Append one JSON object as a new line of a .jsonl file, creating it if needed.
+
+        Args:
+            path: File path; relative paths are resolved against the current phase directory.
+            record: The record as a JSON object string.
+        """
+        target = resolve(path)
+        parsed = json_io.loads(record)
+        await asyncio.to_thread(target.parent.mkdir, parents=True, exist_ok=True)
+        await asyncio.to_thread(json_io.append_jsonl, target, parsed)
+        return f"Appended 1 record to {target}"
+
+    return [append_jsonl]
+
+
+def build_file_tools(fs_root: Path, phase_dir: Path) -> List[FunctionTool]:
+    """
+    In-process file tools for phases that only read and write text artifacts.
+
+    They replace the filesystem MCP server for those phases: paths are resolved
+    against `phase_dir` when relative and must stay inside `fs_root`, so earlier
+    phases' files can be read but nothing outside the files directory is touched.
+    """
+    resolve = _path_resolver(fs_root, phase_dir)
+
+    @function_tool
+    async def write_file(path: str, content: str) -> str:
+        """Write a text file, creating parent directories as needed.
+
+        Args:
+            path: File path; relative paths are resolved against the current phase directory.
+            content: Full text content of the file.
+        """
+        target = resolve(path)
+        await asyncio.to_thread(target.parent.mkdir, parents=True, exist_ok=True)
+        async with aiofiles.open(target, 'w', encoding='utf-8') as f:
+            await f.write(content)
+        return f"Wrote {len(content)} characters to {target}"
+
+    @function_tool
+    async def read_file(path: str) -> str:
+        """Read a text file, e.g. a result saved by an earlier phase.
+
+        Args:
+            path: File path; relative paths are resolved against the current phase directory.
+        """
+        async with aiofiles.open(resolve(path), 'r', encoding='utf-8') as f:
+            return await f.read()
+
+    @function_tool
+    async def list_directory(path: str) -> str:
+        """List a directory, one entry per line; subdirectory names end with "/".
+
+        Args:
+            path: Directory path; relative paths are resolved against the current phase directory.
+        """
+        def scan() -> List[str]:
+            with os.scandir(resolve(path)) as entries:
+                return sorted(e.name + "/" if e.is_dir() else e.name for e in entries)
+
+        return "\n".join(await asyncio.to_thread(scan))
+
+    @function_tool
+    async def read_jsonl(path: str, offset: int, limit: int) -> str:
+        """Read a page of records from a .jsonl file without loading the whole file.
+
+        Args:
+            path: File path; relative paths are resolved against the current phase directory.
+            offset: Number of records to skip.
+            limit: Maximum number of records to return.
+        """
+        def read_page() -> List[str]:
+            records = islice(json_io.iter_jsonl(resolve(path)), offset, offset + limit)
+            return [json_io.dumps(record) for record in records]
+
+        return "\n".join(await asyncio.to_thread(read_page))
+
+    return [write_file, read_file, list_directory, read_jsonl, *build_jsonl_tools(fs_root, phase_dir)]
@@ -0,0 +1,57 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # Stdlib fallback; output is the same compact UTF-8 JSON
+    orjson = None
+
+
+def dumps_bytes(obj: Any, default: Optional[Callable[[Any], Any]] = None, sort_keys: bool = False) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, default=default, sort_keys=sort_keys,
+                      separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None, sort_keys: bool = False) -> str:
+    """Serialize to a compact JSON string."""
+    return dumps_bytes(obj, default=default, sort_keys=sort_keys).decode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from str or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_file(obj: Any, path: Path, default: Optional[Callable[[Any], Any]] = None):
+    """Write `obj` as JSON to `path`, replacing it atomically."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(dumps_bytes(obj, default=default))
+    os.replace(tmp_path, path)
+
+
+def load_file(path: Path) -> Any:
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def append_jsonl(path: Path, record: Any, default: Optional[Callable[[Any], Any]] = None):
+    """Append one record as a line of JSON, so results can be written as they complete."""
+    with open(path, "ab") as f:
+        f.write(dumps_bytes(record, default=default) + b"\n")
+
+
+def iter_jsonl(path: Path) -> Iterator[Any]:
+    """Yield the records of a JSONL file one line at a time; blank lines are skipped."""
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
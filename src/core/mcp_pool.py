@@ -0,0 +1,143 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, List
+
+import structlog
+from agents.mcp import MCPServerStdio
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class MCPServerPair:
+    filesystem: MCPServerStdio
+    playwright: MCPServerStdio
+    stop: asyncio.Event
+    tasks: List[asyncio.Task]
+
+
+class MCPServerPool:
+    """
+    Warm pool of MCP server pairs (filesystem + Playwright) reused across phases.
+
+    A pair is leased by one phase at a time, so concurrent phases (e.g. the
+    Analysis fan-out) get a pair each instead of sharing one browser. On release
+    the pair's browser is closed, so the next phase starts with a fresh browser
+    (no open page, cookies or localStorage), and up to `max_idle` pairs stay
+    running until the pool is closed; extra pairs are stopped.
+    """
+
+    # Playwright MCP server tool that closes the browser; the next navigation
+    # launches a new one
+    _BROWSER_RESET_TOOL = "playwright_close"
+
+    def __init__(self, fs_root: Path, npx_path: str, max_idle: int = 1):
+        self.fs_root = Path(fs_root)
+        self.npx_path = npx_path
+        self.max_idle = max_idle
+        self.logger = logger.bind(component="mcp_server_pool")
+        self._idle: List[MCPServerPair] = []
+        self._leased: List[MCPServerPair] = []
+
+    def _new_servers(self) -> List[MCPServerStdio]:
+        return [
+            MCPServerStdio(
+                name="Filesystem Server",
+                params={
+                    "command": self.npx_path,
+                    "args": ["-y", "@modelcontextprotocol/server-filesystem", str(self.fs_root)],
+                },
+                cache_tools_list=True
+            ),
+            MCPServerStdio(
+                name="Playwright Server",
+                params={
+                    "command": self.npx_path,
+                    "args": ["-y", "@executeautomation/playwright-mcp-server"],
+                },
+                cache_tools_list=True
+            ),
+        ]
+
+    async def _start_pair(self) -> MCPServerPair:
+        """
+        Start both servers concurrently so their `npx` processes spawn in parallel.
+
+        Each server is entered and exited by its own task: the stdio transport runs
+        on an anyio task group, which must be exited by the task that entered it.
+        """
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        servers = self._new_servers()
+        started = [loop.create_future() for _ in servers]
+
+        async def hold(server: MCPServerStdio, ready: asyncio.Future):
+            try:
+                async with server:
+                    ready.set_result(server)
+                    await stop.wait()
+            except BaseException as e:
+                if not ready.done():
+                    ready.set_exception(e)
+                raise
+
+        tasks = [asyncio.create_task(hold(server, ready)) for server, ready in zip(servers, started)]
+        pair = MCPServerPair(servers[0], servers[1], stop, tasks)
+
+        outcomes = await asyncio.gather(*started, return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                await self._close_pair(pair)
+                raise outcome
+
+        self.logger.info("MCP server pair started", fs_root=str(self.fs_root))
+        return pair
+
+    @staticmethod
+    async def _close_pair(pair: MCPServerPair):
+        pair.stop.set()
+        await asyncio.gather(*pair.tasks, return_exceptions=True)
+
+    async def _reset_browser(self, pair: MCPServerPair) -> bool:
+        """Close the pair's browser so no state carries over; False if that failed."""
+        try:
+            result = await pair.playwright.call_tool(self._BROWSER_RESET_TOOL, {})
+        except Exception as e:
+            self.logger.warning("Failed to reset browser, discarding server pair", error=str(e))
+            return False
+        if result.isError:
+            self.logger.warning("Failed to reset browser, discarding server pair",
+                                error=str(result.content))
+            return False
+        return True
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[MCPServerPair]:
+        """
+        Lease a running server pair. A pair whose user failed, whose browser could
+        not be reset, or that exceeds `max_idle` is stopped instead of reused.
+        """
+        pair = self._idle.pop() if self._idle else await self._start_pair()
+        self._leased.append(pair)
+        try:
+            yield pair
+        except BaseException:
+            self._leased.remove(pair)
+            await self._close_pair(pair)
+            raise
+        else:
+            self._leased.remove(pair)
+            # Checked again after the reset: other pairs may have been released meanwhile
+            if (len(self._idle) < self.max_idle and await self._reset_browser(pair)
+                    and len(self._idle) < self.max_idle):
+                self._idle.append(pair)
+            else:
+                await self._close_pair(pair)
+
+    async def aclose(self):
+        """Stop every server started by the pool."""
+        pairs, self._idle = self._idle + self._leased, []
+        self._leased = []
+        await asyncio.gather(*(self._close_pair(pair) for pair in pairs))
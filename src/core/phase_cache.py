@@ -0,0 +1,62 @@
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import structlog
+
+from . import json_io
+
+logger = structlog.get_logger()
+
+
+class PhaseCache:
+    """
+    Content-addressed store for phase results.
+
+    A phase result is keyed by the SHA-256 of its inputs: the phase, the target
+    URL, the requirements and the hash of the upstream phase output. Editing the
+    requirements invalidates every phase, while a changed Analysis output only
+    invalidates the phases downstream of it.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logger.bind(component="phase_cache")
+
+    @staticmethod
+    def hash_text(text: Optional[str]) -> str:
+        return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(phase: str, target_url: str, requirements_hash: str, upstream_hash: str) -> str:
+        payload = {
+            "phase": phase,
+            "target_url": target_url,
+            "requirements_hash": requirements_hash,
+            "upstream_hash": upstream_hash,
+        }
+        return hashlib.sha256(json_io.dumps_bytes(payload, sort_keys=True)).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+
+        try:
+            result = json_io.load_file(path)
+        except (OSError, ValueError) as e:
+            self.logger.warning("Unreadable phase cache entry", key=key, error=str(e))
+            return None
+
+        self.logger.info("Phase cache hit", key=key, phase=result.get("phase"))
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Persist a phase result atomically so readers never see a partial file."""
+        json_io.dump_file(result, self._path(key), default=str)
+
+        self.logger.info("Phase cache entry stored", key=key, phase=result.get("phase"))
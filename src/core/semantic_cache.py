@@ -0,0 +1,177 @@
+import asyncio
+import math
+import sqlite3
+import threading
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import structlog
+from openai import AsyncAzureOpenAI
+
+from . import json_io
+
+logger = structlog.get_logger()
+
+
+class SemanticCache:
+    """
+    Embedding-keyed cache for expensive LLM-driven results.
+
+    Entries are scoped by an exact key (e.g. target URL + phase) and matched on
+    the cosine similarity of the embedded request text, so semantically
+    equivalent requirement strings reuse a stored result instead of re-running
+    the agents.
+
+    Embeddings are stored unit-normalized as float32 blobs, so a lookup is one
+    dot product per entry; at most `max_entries_per_scope` recent entries are
+    kept per scope. With `max_age`, older entries are ignored on lookup.
+    SQLite access runs in a worker thread, off the event loop.
+    """
+
+    # Bumped when the table layout changes; older tables are dropped on open
+    _SCHEMA_VERSION = 1
+
+    def __init__(self, client: AsyncAzureOpenAI, db_path: Path,
+                 embedding_model: str = "text-embedding-3-small",
+                 verification_model: Optional[str] = None,
+                 hit_threshold: float = 0.92,
+                 gray_zone_threshold: float = 0.85,
+                 max_entries_per_scope: int = 64,
+                 max_age: Optional[timedelta] = None):
+        self.client = client
+        self.db_path = Path(db_path)
+        self.embedding_model = embedding_model
+        self.verification_model = verification_model
+        self.hit_threshold = hit_threshold
+        self.gray_zone_threshold = gray_zone_threshold
+        self.max_entries_per_scope = max_entries_per_scope
+        self.max_age = max_age
+        self.logger = logger.bind(component="semantic_cache")
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Used from worker threads one call at a time, guarded by _lock
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < self._SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS entries")
+            self._conn.execute(f"PRAGMA user_version = {self._SCHEMA_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "scope TEXT NOT NULL, "
+            "text TEXT NOT NULL, "
+            "embedding BLOB NOT NULL, "
+            "payload TEXT NOT NULL, "
+            "created_at TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_scope ON entries (scope)")
+        self._conn.commit()
+
+    async def _embed(self, text: str) -> array:
+        """Embed request text with the configured embedding deployment, unit-normalized."""
+        response = await self.client.embeddings.create(model=self.embedding_model, input=text)
+        return self._normalize(response.data[0].embedding)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> array:
+        norm = math.sqrt(sum(x * x for x in embedding))
+        return array("f", (x / norm for x in embedding) if norm else embedding)
+
+    def _best_match(self, scope: str, embedding: array) -> Optional[Tuple[float, str, Any]]:
+        """Return (similarity, cached text, payload) of the closest entry in scope."""
+        best = None
+        # ISO-format timestamps compare correctly as strings
+        oldest = (datetime.now() - self.max_age).isoformat(timespec="seconds") if self.max_age else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT text, embedding, payload FROM entries WHERE scope = ? AND created_at >= ?",
+                (scope, oldest),
+            ).fetchall()
+        for text, stored_embedding, payload in rows:
+            # Both vectors are unit length, so the dot product is the cosine similarity
+            similarity = math.fsum(map(float.__mul__, embedding, array("f", stored_embedding)))
+            if best is None or similarity > best[0]:
+                best = (similarity, text, payload)
+
+        if best is None:
+            return None
+        return best[0], best[1], json_io.loads(best[2])
+
+    async def _verify_equivalent(self, cached_text: str, text: str) -> bool:
+        """Cheap LLM check for gray-zone matches; without a verifier they count as misses."""
+        if not self.verification_model:
+            return False
+
+        response = await self.client.chat.completions.create(
+            model=self.verification_model,
+            messages=[{
+                "role": "user",
+                "content": (
+                    "Do these two testing requirement descriptions ask for the same testing work? "
+                    "Answer only YES or NO.\n\n"
+                    f"A:\n{cached_text}\n\nB:\n{text}"
+                ),
+            }],
+            max_tokens=3,
+            temperature=0,
+        )
+        answer = (response.choices[0].message.content or "").strip().lower()
+        return answer.startswith("yes")
+
+    def _store(self, scope: str, text: str, embedding: array, payload: Any):
+        """Insert an entry and drop the oldest ones beyond the per-scope cap."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO entries (scope, text, embedding, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (scope, text, embedding.tobytes(), json_io.dumps(payload, default=str),
+                 datetime.now().isoformat(timespec="seconds")),
+            )
+            self._conn.execute(
+                "DELETE FROM entries WHERE scope = ? AND id NOT IN "
+                "(SELECT id FROM entries WHERE scope = ? ORDER BY id DESC LIMIT ?)",
+                (scope, scope, self.max_entries_per_scope),
+            )
+            self._conn.commit()
+
+    async def get_or_compute(self, scope: str, text: str,
+                             compute: Callable[[], Awaitable[Any]],
+                             cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Return the cached result for a semantically equivalent request in `scope`,
+        otherwise await `compute()` and persist its result.
+        """
+        try:
+            embedding = await self._embed(text)
+        except Exception as e:
+            self.logger.warning("Embedding failed, bypassing cache", scope=scope, error=str(e))
+            return await compute()
+
+        match = await asyncio.to_thread(self._best_match, scope, embedding)
+        if match is not None:
+            similarity, cached_text, payload = match
+            if similarity >= self.hit_threshold:
+                self.logger.info("Semantic cache hit", scope=scope, similarity=round(similarity, 4))
+                return payload
+
+            if similarity >= self.gray_zone_threshold:
+                try:
+                    equivalent = await self._verify_equivalent(cached_text, text)
+                except Exception as e:
+                    self.logger.warning("Cache verification failed", scope=scope, error=str(e))
+                    equivalent = False
+                if equivalent:
+                    self.logger.info("Semantic cache hit after verification",
+                                     scope=scope, similarity=round(similarity, 4))
+                    return payload
+
+        result = await compute()
+        if cacheable is None or cacheable(result):
+            await asyncio.to_thread(self._store, scope, text, embedding, result)
+            self.logger.info("Semantic cache entry stored", scope=scope)
+        return result
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,51 @@
+import pytest
+
+from src.core.file_tools import _path_resolver
+
+
+@pytest.fixture
+def fs_root(tmp_path):
+    root = tmp_path / "fs_files"
+    (root / "planning_20240101_000000").mkdir(parents=True)
+    (root / "analysis_20240101_000000").mkdir()
+    return root
+
+
+@pytest.fixture
+def resolve(fs_root):
+    return _path_resolver(fs_root, fs_root / "planning_20240101_000000")
+
+
+def test_relative_path_resolves_against_phase_dir(resolve, fs_root):
+    assert resolve("test_plan.md") == (fs_root / "planning_20240101_000000" / "test_plan.md").resolve()
+
+
+def test_sibling_phase_dir_is_allowed(resolve, fs_root):
+    assert resolve("../analysis_20240101_000000/result.json") == \
+        (fs_root / "analysis_20240101_000000" / "result.json").resolve()
+
+
+def test_absolute_path_inside_root_is_allowed(resolve, fs_root):
+    target = fs_root / "analysis_20240101_000000" / "result.json"
+    assert resolve(str(target)) == target.resolve()
+
+
+@pytest.mark.parametrize("path", ["../../secret.txt", "../../fs_files_other/x.md", "../.."])
+def test_parent_traversal_outside_root_is_rejected(resolve, path):
+    with pytest.raises(ValueError, match="outside the files directory"):
+        resolve(path)
+
+
+def test_absolute_path_outside_root_is_rejected(resolve, tmp_path):
+    with pytest.raises(ValueError, match="outside the files directory"):
+        resolve(str(tmp_path / "elsewhere.txt"))
+    with pytest.raises(ValueError, match="outside the files directory"):
+        resolve("/etc/passwd")
+
+
+def test_symlink_out_of_root_is_rejected(resolve, fs_root, tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (fs_root / "planning_20240101_000000" / "link").symlink_to(outside)
+    with pytest.raises(ValueError, match="outside the files directory"):
+        resolve("link/file.txt")
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from src.core import json_io
+
+
+def test_dumps_loads_round_trip():
+    obj = {"b": [1, 2.5, None, True], "a": "ünïcode ✅"}
+    assert json_io.loads(json_io.dumps(obj)) == obj
+    assert json_io.loads(json_io.dumps_bytes(obj)) == obj
+
+
+def test_sort_keys_is_stable():
+    assert json_io.dumps({"b": 1, "a": 2}, sort_keys=True) == '{"a":2,"b":1}'
+
+
+def test_dump_file_load_file(tmp_path):
+    path = tmp_path / "result.json"
+    phase_dir = Path("reports") / "fs_files"
+    json_io.dump_file({"phase_dir": phase_dir}, path, default=str)
+
+    assert json_io.load_file(path) == {"phase_dir": str(phase_dir)}
+    assert not path.with_name("result.json.tmp").exists()
+
+
+def test_append_and_iter_jsonl(tmp_path):
+    path = tmp_path / "results.jsonl"
+    records = [{"id": "TC001", "status": "PASSED"}, {"id": "TC002", "status": "FAILED"}]
+    for record in records:
+        json_io.append_jsonl(path, record)
+
+    with open(path, "ab") as f:
+        f.write(b"\n")  # Blank lines are skipped
+
+    assert list(json_io.iter_jsonl(path)) == records
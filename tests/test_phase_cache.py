@@ -0,0 +1,34 @@
+from src.core.phase_cache import PhaseCache
+
+
+def test_put_get_round_trip(tmp_path):
+    cache = PhaseCache(tmp_path / "phases")
+    key = PhaseCache.make_key("analysis", "https://example.com", PhaseCache.hash_text("req"), "")
+    result = {"phase": "analysis", "status": "completed", "result": "Analysis ✅ output"}
+
+    cache.put(key, result)
+
+    assert cache.get(key) == result
+    # Written atomically; no temporary file is left behind
+    assert [p.name for p in (tmp_path / "phases").iterdir()] == [f"{key}.json"]
+
+
+def test_get_missing_key_returns_none(tmp_path):
+    assert PhaseCache(tmp_path).get("0" * 64) is None
+
+
+def test_get_unreadable_entry_returns_none(tmp_path):
+    cache = PhaseCache(tmp_path)
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+    assert cache.get("broken") is None
+
+
+def test_make_key_depends_on_every_input():
+    base = ("planning", "https://example.com", PhaseCache.hash_text("req"), PhaseCache.hash_text("up"))
+    key = PhaseCache.make_key(*base)
+
+    assert key == PhaseCache.make_key(*base)
+    for index in range(len(base)):
+        changed = list(base)
+        changed[index] = changed[index] + "x"
+        assert PhaseCache.make_key(*changed) != key
@@ -0,0 +1,190 @@
+import math
+import sqlite3
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.semantic_cache import SemanticCache
+
+# Unit vectors with known cosine similarity to BASE
+BASE = [1.0, 0.0]
+GRAY = [0.9, math.sqrt(1 - 0.9 ** 2)]  # 0.90: between the gray-zone and hit thresholds
+FAR = [0.0, 1.0]  # 0.00
+
+
+class FakeClient:
+    """Stands in for AsyncAzureOpenAI: fixed embeddings per text and a canned verifier answer."""
+
+    def __init__(self, vectors, verdict="YES"):
+        self.vectors = vectors
+        self.verdict = verdict
+        self.verifications = 0
+        self.embeddings = SimpleNamespace(create=self._embed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._verify))
+
+    async def _embed(self, model, input):
+        if input not in self.vectors:
+            raise RuntimeError("embedding service unavailable")
+        return SimpleNamespace(data=[SimpleNamespace(embedding=self.vectors[input])])
+
+    async def _verify(self, **kwargs):
+        self.verifications += 1
+        message = SimpleNamespace(content=self.verdict)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_compute(value):
+    calls = []
+
+    async def compute():
+        calls.append(value)
+        return value
+
+    return compute, calls
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "cache.sqlite3"
+
+
+def entry_count(cache, scope=None):
+    if scope is None:
+        return cache._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    return cache._conn.execute("SELECT COUNT(*) FROM entries WHERE scope = ?", (scope,)).fetchone()[0]
+
+
+async def test_identical_request_is_a_hit(db_path):
+    cache = SemanticCache(FakeClient({"a": BASE}), db_path)
+    first, first_calls = make_compute({"run": 1})
+    second, second_calls = make_compute({"run": 2})
+
+    assert await cache.get_or_compute("scope", "a", first) == {"run": 1}
+    assert await cache.get_or_compute("scope", "a", second) == {"run": 1}
+    assert (first_calls, second_calls) == ([{"run": 1}], [])
+    cache.close()
+
+
+async def test_other_scope_is_a_miss(db_path):
+    cache = SemanticCache(FakeClient({"a": BASE}), db_path)
+    first, _ = make_compute(1)
+    second, second_calls = make_compute(2)
+
+    await cache.get_or_compute("scope-1", "a", first)
+    assert await cache.get_or_compute("scope-2", "a", second) == 2
+    assert second_calls == [2]
+    cache.close()
+
+
+@pytest.mark.parametrize("verdict, expected", [("YES", 1), ("NO", 2)])
+async def test_gray_zone_uses_verifier(db_path, verdict, expected):
+    client = FakeClient({"a": BASE, "b": GRAY}, verdict=verdict)
+    cache = SemanticCache(client, db_path, verification_model="verifier")
+    first, _ = make_compute(1)
+    second, _ = make_compute(2)
+
+    await cache.get_or_compute("scope", "a", first)
+    assert await cache.get_or_compute("scope", "b", second) == expected
+    assert client.verifications == 1
+    cache.close()
+
+
+async def test_gray_zone_without_verifier_is_a_miss(db_path):
+    client = FakeClient({"a": BASE, "b": GRAY})
+    cache = SemanticCache(client, db_path)
+    first, _ = make_compute(1)
+    second, _ = make_compute(2)
+
+    await cache.get_or_compute("scope", "a", first)
+    assert await cache.get_or_compute("scope", "b", second) == 2
+    assert client.verifications == 0
+    cache.close()
+
+
+async def test_dissimilar_request_is_a_miss_without_verification(db_path):
+    client = FakeClient({"a": BASE, "b": FAR})
+    cache = SemanticCache(client, db_path, verification_model="verifier")
+    first, _ = make_compute(1)
+    second, _ = make_compute(2)
+
+    await cache.get_or_compute("scope", "a", first)
+    assert await cache.get_or_compute("scope", "b", second) == 2
+    assert client.verifications == 0
+    cache.close()
+
+
+async def test_uncacheable_result_is_not_stored(db_path):
+    cache = SemanticCache(FakeClient({"a": BASE}), db_path)
+    compute, _ = make_compute({"overall_status": "partial"})
+
+    await cache.get_or_compute("scope", "a", compute,
+                               cacheable=lambda r: r["overall_status"] == "completed")
+    assert entry_count(cache) == 0
+    cache.close()
+
+
+async def test_embedding_failure_bypasses_cache(db_path):
+    cache = SemanticCache(FakeClient({}), db_path)
+    compute, calls = make_compute(1)
+
+    assert await cache.get_or_compute("scope", "a", compute) == 1
+    assert calls == [1]
+    assert entry_count(cache) == 0
+    cache.close()
+
+
+async def test_entries_per_scope_are_capped(db_path):
+    vectors = {"a": BASE, "b": FAR, "c": [-1.0, 0.0]}
+    cache = SemanticCache(FakeClient(vectors), db_path, max_entries_per_scope=2)
+    for text in ("a", "b", "c"):
+        compute, _ = make_compute(text)
+        await cache.get_or_compute("scope", text, compute)
+    compute, _ = make_compute("other")
+    await cache.get_or_compute("other-scope", "a", compute)
+
+    assert entry_count(cache, "scope") == 2
+    assert entry_count(cache, "other-scope") == 1
+    # The oldest entry was evicted, so "a" is computed again
+    recompute, calls = make_compute("a again")
+    assert await cache.get_or_compute("scope", "a", recompute) == "a again"
+    assert calls == ["a again"]
+    cache.close()
+
+
+async def test_entries_older_than_max_age_are_ignored(db_path):
+    cache = SemanticCache(FakeClient({"a": BASE}), db_path, max_age=timedelta(hours=1))
+    first, _ = make_compute(1)
+    await cache.get_or_compute("scope", "a", first)
+    cache._conn.execute("UPDATE entries SET created_at = '2000-01-01T00:00:00'")
+    cache._conn.commit()
+
+    second, calls = make_compute(2)
+    assert await cache.get_or_compute("scope", "a", second) == 2
+    assert calls == [2]
+    cache.close()
+
+
+def test_old_schema_is_dropped_on_open(db_path):
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("CREATE TABLE entries (id INTEGER PRIMARY KEY, scope TEXT, text TEXT, "
+                 "embedding TEXT, payload TEXT, created_at TEXT)")
+    conn.execute("INSERT INTO entries (scope, text, embedding, payload, created_at) "
+                 "VALUES ('scope', 'a', '[1.0, 0.0]', '1', '2024-01-01T00:00:00')")
+    conn.commit()
+    conn.close()
+
+    cache = SemanticCache(FakeClient({}), db_path)
+    assert cache._conn.execute("PRAGMA user_version").fetchone()[0] == SemanticCache._SCHEMA_VERSION
+    assert entry_count(cache) == 0
+    cache.close()
+
+    # Reopening a current database keeps its entries
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("INSERT INTO entries (scope, text, embedding, payload, created_at) "
+                 "VALUES ('scope', 'a', x'', '1', '2024-01-01T00:00:00')")
+    conn.commit()
+    conn.close()
+    cache = SemanticCache(FakeClient({}), db_path)
+    assert entry_count(cache) == 1
+    cache.close()